@@ -49,9 +49,27 @@ def load_results():
         performance_summaries = json.load(f)
     return all_results, performance_summaries
 
+@st.cache_data(show_spinner=False)
+def load_market_data(symbols):
+    # symbols is a tuple so the call is hashable; CSVs are parsed once per session
+    return DataLoader(DATA_PATH).load_multiple_csvs(list(symbols))
+
+@st.cache_data(show_spinner=False)
+def load_equity_curve(ticker, strategy):
+    # Built once per (ticker, strategy); re-selecting a pair reuses the DataFrame
+    all_results, _ = load_results()
+    equity_curve_data = all_results[ticker][strategy]["equity_curve"]
+    return pd.DataFrame(
+        {"equity": equity_curve_data["equity"]},
+        index=pd.to_datetime(equity_curve_data["index"], unit="ms")
+    )
+
 def plot_equity_curve(equity_curve_df, title):
+    return build_equity_figure(equity_curve_df.index, equity_curve_df["equity"], title)
+
+def build_equity_figure(x, y, title):
     fig = go.Figure()
-    fig.add_trace(go.Scatter(x=equity_curve_df.index, y=equity_curve_df["equity"], mode='lines', name='Equity Curve'))
+    fig.add_trace(go.Scatter(x=x, y=y, mode='lines', name='Equity Curve'))
     fig.update_layout(
         title=title,
         xaxis_title='Date',
@@ -61,11 +79,10 @@ def plot_equity_curve(equity_curve_df, title):
     )
     return fig
 
-def run_live_simulation(strategy_name, strategy_params, symbols, initial_cash):
+def run_live_simulation(strategy_name, strategy_params, symbols, initial_cash, realistic_pacing=False):
     st.subheader(f"Live Simulation for {strategy_name} on {symbols}")
     
-    data_loader = DataLoader(DATA_PATH)
-    data = data_loader.load_multiple_csvs(symbols)
+    data = load_market_data(tuple(symbols))
 
     if data is None or data.empty:
         st.error(f"Could not load data for {symbols}. Cannot run live simulation.")
@@ -80,42 +97,60 @@ def run_live_simulation(strategy_name, strategy_params, symbols, initial_cash):
         strategy = STRATEGY_MAPPING[strategy_name](symbol=symbols[0], **strategy_params)
 
     engine.set_strategy(strategy)
+    strategy.initialize(engine.portfolio_manager)
+    strategy.set_data(data)
 
     equity_curve_placeholder = st.empty()
     metrics_placeholder = st.empty()
-    
-    equity_data = []
 
-    for i, (index, row) in enumerate(data.iterrows()):
-        current_prices = {}
-        for col in data.columns:
-            if col.startswith("Close_"):
-                symbol = col.replace("Close_", "")
-                current_prices[symbol] = row[col]
-
-        engine.portfolio_manager.update_portfolio(current_prices, index)
-        if hasattr(strategy, 'symbol') and strategy.symbol in current_prices:
-            strategy.check_stop_loss(current_prices[strategy.symbol])
-        strategy.on_bar(i, row)
+    close_cols = [col for col in data.columns if col.startswith("Close_")]
+    sim_symbols = [col.replace("Close_", "") for col in close_cols]
+    close_rows = data[close_cols].to_numpy().tolist()
+    timestamps = data.index.to_numpy()
+    strategy_col = sim_symbols.index(strategy.symbol) if strategy.symbol in sim_symbols else None
+
+    engine.portfolio_manager.allocate_equity_curve(timestamps, sim_symbols)
+    num_bars = len(timestamps)
+    # Redrawing the chart is far more expensive than simulating a bar, so only
+    # refresh ~200 times per run unless realistic pacing was requested.
+    update_every = 1 if realistic_pacing else max(1, num_bars // 200)
+    # One figure for the whole run; each redraw only swaps in views of the preallocated arrays
+    fig = build_equity_figure([], [], f"Live Equity Curve - {strategy_name} on {symbols}")
+    equity_trace = fig.data[0]
+
+    for i in range(len(timestamps)):
+        index = timestamps[i]
+        prices = close_rows[i]
+
+        engine.portfolio_manager.record_equity(i, prices)
+        if strategy_col is None:
+            strategy.on_bar(i, data.iloc[i])
+        else:
+            # Stop-loss orders are stamped with the bar that triggered them
+            strategy.current_index = i
+            strategy.check_stop_loss(prices[strategy_col])
+            strategy.on_bar_fast(i, prices[strategy_col], index)
 
-        equity_data.append({'timestamp': index, 'equity': engine.portfolio_manager.equity_curve[-1]['equity']})
-        equity_df = pd.DataFrame(equity_data).set_index("timestamp")
+        if i % update_every != 0 and i != num_bars - 1:
+            continue
 
-        with equity_curve_placeholder.container():
-            st.plotly_chart(plot_equity_curve(equity_df, f"Live Equity Curve - {strategy_name} on {symbols}"), use_container_width=True)
+        equity_trace.x = timestamps[:i + 1]
+        equity_trace.y = engine.portfolio_manager.equity_values[:i + 1]
+        equity_curve_placeholder.plotly_chart(fig, use_container_width=True)
         
         with metrics_placeholder.container():
             current_metrics = {
                 "Current Cash": engine.portfolio_manager.cash,
-                "Current Equity": engine.portfolio_manager.equity_curve[-1]['equity'],
-                "Open Positions": {s: p['quantity'] for s, p in engine.portfolio_manager.positions.items()}
+                "Current Equity": engine.portfolio_manager.equity_values[i],
+                "Open Positions": engine.portfolio_manager.open_quantities()
             }
             st.json(current_metrics)
 
-        time.sleep(0.1) # Simulate real-time delay
+        if realistic_pacing:
+            time.sleep(0.1) # Simulate real-time delay
 
     st.success("Live simulation finished!")
-    final_calculator = PerformanceCalculator(engine.portfolio_manager.equity_curve, engine.portfolio_manager.trades, engine.portfolio_manager.closed_trades)
+    final_calculator = PerformanceCalculator(engine.portfolio_manager.equity_curve, engine.portfolio_manager.trades, engine.portfolio_manager.closed_trade_array())
     st.subheader("Final Performance Report")
     st.table(pd.DataFrame([final_calculator.generate_performance_report()]).T.rename(columns={0: "Value"}))
 
@@ -128,6 +163,11 @@ if not all_results or not performance_summaries:
     st.warning("No backtest results found. Please run backtests first using `scripts/run_backtest.py`.")
 else:
     st.sidebar.header("Select Options")
+    if st.sidebar.button("Reload Results"):
+        load_results.clear()
+        load_market_data.clear()
+        load_equity_curve.clear()
+        st.rerun()
     
     mode = st.sidebar.radio("Choose Mode", ["View Backtest Results", "Run Live Simulation"])
 
@@ -155,12 +195,7 @@ else:
 
                 # Plot Equity Curve
                 st.subheader("Equity Curve")
-                equity_curve_json = all_results[selected_ticker_or_pair][selected_strategy]["equity_curve"]
-                equity_curve_df = pd.DataFrame(
-                    data=json.loads(equity_curve_json)["data"],
-                    index=pd.to_datetime(json.loads(equity_curve_json)["index"], unit="ms"),
-                    columns=json.loads(equity_curve_json)["columns"]
-                )
+                equity_curve_df = load_equity_curve(selected_ticker_or_pair, selected_strategy)
                 fig = plot_equity_curve(equity_curve_df, f'{selected_ticker_or_pair} - {selected_strategy} Equity Curve')
                 st.plotly_chart(fig, use_container_width=True)
 
@@ -213,8 +248,10 @@ else:
 
                     st.sidebar.json(default_params) # Display default params
 
+                    realistic_pacing = st.sidebar.checkbox("Realistic pacing (redraw every bar)", value=False)
+
                     if st.sidebar.button("Start Live Simulation"):
-                        run_live_simulation(selected_sim_strategy_name, default_params, selected_sim_symbols, CONFIG['backtest']['initial_cash'])
+                        run_live_simulation(selected_sim_strategy_name, default_params, selected_sim_symbols, CONFIG['backtest']['initial_cash'], realistic_pacing)
 
 
     st.sidebar.markdown("""
@@ -1,10 +1,12 @@
 import random
 import numpy as np
-from deap import base, creator, tools, algorithms
+from deap import base, creator, tools, algorithms, cma
 from functools import partial
 import yaml
 import os
 import sys # Import sys for stdout redirection
+import pickle
+from concurrent.futures import ProcessPoolExecutor
 from src.backtesting.engine import BacktestingEngine
 from src.reporting.performance import PerformanceCalculator
 from src.strategies.moving_average_crossover import MovingAverageCrossover
@@ -13,6 +15,7 @@ from src.strategies.mean_reversion import MeanReversion
 from src.strategies.lstm_strategy import LSTMStrategy
 from src.strategies.pairs_trading_strategy import PairsTradingStrategy
 from src.data.data_loader import DataLoader
+from src.utils.shared_data import share_dataframe, attach_dataframe
 
 # --- Configuration --- #
 CONFIG_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "configs", "config.yml")
@@ -61,11 +64,229 @@ def clamp_individual_param(param_value, param_index, strategy_name):
     return param_value
 
 
-    toolbox = setup_toolbox(strategy_name)
-    toolbox = setup_toolbox(strategy_name)
+# Search ranges of each strategy's parameters, in the order of clamp_individual_param
+PARAM_SPACES = {
+    "moving_average_crossover": [("short_window", 10, 100), ("long_window", 100, 300), ("stop_loss_percentage", 0.01, 0.05)],
+    "rsi_strategy": [("rsi_period", 7, 21), ("overbought_threshold", 60.0, 80.0), ("oversold_threshold", 20.0, 40.0), ("stop_loss_percentage", 0.01, 0.05)],
+    "mean_reversion": [("window", 10, 50), ("num_std_dev", 1.0, 3.0), ("stop_loss_percentage", 0.01, 0.05)],
+    "lstm_strategy": [("look_back", 30, 90), ("epochs", 5, 20), ("batch_size", 16, 64), ("train_split", 0.7, 0.9), ("stop_loss_percentage", 0.01, 0.05)],
+    "pairs_trading_strategy": [("window", 30, 90), ("entry_zscore", 1.5, 3.0), ("exit_zscore", 0.0, 1.0), ("stop_loss_percentage", 0.01, 0.05)],
+}
+
+def random_individual(strategy_name):
+    space = PARAM_SPACES[strategy_name]
+    return creator.Individual(
+        clamp_individual_param(random.uniform(low, high), i, strategy_name) for i, (_, low, high) in enumerate(space)
+    )
+
+def mutate_individual(individual, strategy_name, indpb=0.2):
+    # Gaussian step scaled to each parameter's range, then clamped back into it
+    for i, (_, low, high) in enumerate(PARAM_SPACES[strategy_name]):
+        if random.random() < indpb:
+            individual[i] = clamp_individual_param(individual[i] + random.gauss(0, (high - low) * 0.1), i, strategy_name)
+    return individual,
+
+def setup_toolbox(strategy_name):
+    toolbox = base.Toolbox()
+    toolbox.register("individual", random_individual, strategy_name)
+    toolbox.register("population", tools.initRepeat, list, toolbox.individual)
+    toolbox.register("mate", tools.cxTwoPoint)
+    toolbox.register("mutate", mutate_individual, strategy_name=strategy_name)
+    toolbox.register("select", tools.selTournament, tournsize=3)
+    return toolbox
+
+def generate_clamped(cma_strategy, strategy_name):
+    # CMA-ES samples unbounded floats; repair them into the parameter space before evaluation
+    population = cma_strategy.generate(creator.Individual)
+    for individual in population:
+        for i in range(len(individual)):
+            individual[i] = clamp_individual_param(float(individual[i]), i, strategy_name)
+    return population
+
+def setup_cma_toolbox(strategy_name, lambda_, sigma=0.3):
+    # Start at the centre of the search space with a per-parameter step proportional to
+    # its range, so windows and stop-loss fractions are explored on comparable scales.
+    space = PARAM_SPACES[strategy_name]
+    centroid = [(low + high) / 2 for _, low, high in space]
+    cmatrix = np.diag([float(high - low) ** 2 for _, low, high in space])
+    cma_strategy = cma.Strategy(centroid=centroid, sigma=sigma, lambda_=lambda_, cmatrix=cmatrix)
+    toolbox = base.Toolbox()
+    toolbox.register("generate", generate_clamped, cma_strategy, strategy_name)
+    toolbox.register("update", cma_strategy.update)
+    return toolbox
+
+# Market data of the current optimization; attached in worker processes by init_worker
+_DATA = None
+_DATA_SHM = None  # keeps the shared block alive while _DATA views it
+
+def init_worker(data_spec):
+    global _DATA, _DATA_SHM
+    _DATA_SHM, _DATA = attach_dataframe(data_spec)
+
+def cached_map(map_func, fitness_cache):
+    """
+    Wraps a toolbox map so each distinct parameter set is backtested only once.
+
+    Individuals are keyed by their (already clamped) parameter tuple; only keys missing
+    from fitness_cache are handed to map_func, and each of those is evaluated once even
+    if several individuals of the batch share it.
+
+    Args:
+        map_func: The map used to run the evaluations, e.g. an executor's map.
+        fitness_cache: Dict of parameter tuple to fitness, updated in place.
+
+    Returns:
+        A map-compatible function for toolbox.register("map", ...).
+    """
+    def _map(evaluate, individuals):
+        keys = [tuple(individual) for individual in individuals]
+        pending = list(dict.fromkeys(key for key in keys if key not in fitness_cache))
+        fitness_cache.update(zip(pending, map_func(evaluate, pending)))
+        return [fitness_cache[key] for key in keys]
+    return _map
+
+def load_fitness_cache(cache_file, strategy_name, symbols):
+    # A cache is only reused for the same strategy and symbols; delete the file when the data changes
+    if not cache_file or not os.path.exists(cache_file):
+        return {}
+    with open(cache_file, 'rb') as f:
+        saved = pickle.load(f)
+    if saved.get('strategy_name') != strategy_name or saved.get('symbols') != list(symbols):
+        return {}
+    return saved['fitness']
+
+def save_fitness_cache(cache_file, strategy_name, symbols, fitness_cache):
+    with open(cache_file, 'wb') as f:
+        pickle.dump({'strategy_name': strategy_name, 'symbols': list(symbols), 'fitness': fitness_cache}, f)
+
+def evaluate_strategy_individual(individual, strategy_name, symbols_to_load, data=None):
+    if data is None:
+        data = _DATA
+    params = {name: value for (name, _, _), value in zip(PARAM_SPACES[strategy_name], individual)}
+    strategy_class = STRATEGY_MAPPING[strategy_name]
+    initial_cash = CONFIG['backtest']['initial_cash']
+    data_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
+
+    if strategy_name == "pairs_trading_strategy":
+        runs = [{"symbol1": symbols_to_load[0], "symbol2": symbols_to_load[1]}]
+    else:
+        runs = [{"symbol": symbol} for symbol in symbols_to_load]
+
+    # Suppress the backtests' trade output so only the GA's generation log is shown
+    sharpe_ratios = []
+    original_stdout = sys.stdout
+    with open(os.devnull, 'w') as devnull:
+        sys.stdout = devnull
+        try:
+            for symbol_params in runs:
+                engine = BacktestingEngine(initial_cash=initial_cash, data_path=data_path)
+                engine.set_data(data)
+                engine.set_strategy(strategy_class(**symbol_params, **params))
+                result = engine.run_backtest()
+                if result is None:
+                    continue
+                equity, trades = result
+                calculator = PerformanceCalculator(equity, trades, engine.portfolio_manager.closed_trade_array())
+                sharpe_ratios.append(calculator.sharpe_ratio())
+        finally:
+            sys.stdout = original_stdout
+
+    sharpe_ratios = [sharpe for sharpe in sharpe_ratios if np.isfinite(sharpe)]
+    if not sharpe_ratios:
+        return -np.inf,
+    return float(np.mean(sharpe_ratios)),
+
+def save_checkpoint(checkpoint_file, population, halloffame, logbook, generation):
+    # Write to a temporary file first so a crash mid-write keeps the previous checkpoint
+    checkpoint = {
+        'population': population,
+        'halloffame': halloffame,
+        'logbook': logbook,
+        'generation': generation,
+        'rndstate': random.getstate(),
+        'np_rndstate': np.random.get_state(),
+    }
+    with open(checkpoint_file + ".tmp", 'wb') as f:
+        pickle.dump(checkpoint, f)
+    os.replace(checkpoint_file + ".tmp", checkpoint_file)
+
+def ea_simple_checkpointed(population, toolbox, cxpb, mutpb, ngen, stats, halloffame, checkpoint_file=None, checkpoint_freq=5):
+    """
+    Runs DEAP's eaSimple loop, pickling its state every checkpoint_freq generations.
+
+    If checkpoint_file already exists, the run resumes after the generation stored in it
+    instead of starting from the given population.
+
+    Args:
+        population: The initial population.
+        toolbox: The toolbox with evaluate, mate, mutate, select and map registered.
+        cxpb: The crossover probability.
+        mutpb: The mutation probability.
+        ngen: The number of generations.
+        stats: The statistics compiled every generation.
+        halloffame: The hall of fame, updated in place.
+        checkpoint_file: Optional path of the checkpoint to write and resume from.
+        checkpoint_freq: The number of generations between checkpoints.
+
+    Returns:
+        The final population and the logbook.
+    """
+    if checkpoint_file and os.path.exists(checkpoint_file):
+        with open(checkpoint_file, 'rb') as f:
+            checkpoint = pickle.load(f)
+        population = checkpoint['population']
+        halloffame.update(checkpoint['halloffame'])
+        logbook = checkpoint['logbook']
+        start_gen = checkpoint['generation'] + 1
+        random.setstate(checkpoint['rndstate'])
+        np.random.set_state(checkpoint['np_rndstate'])
+        print(f"Resuming from generation {start_gen} of {checkpoint_file}")
+    else:
+        logbook = tools.Logbook()
+        logbook.header = ['gen', 'nevals'] + stats.fields
+        invalid_ind = [ind for ind in population if not ind.fitness.valid]
+        for ind, fit in zip(invalid_ind, toolbox.map(toolbox.evaluate, invalid_ind)):
+            ind.fitness.values = fit
+        halloffame.update(population)
+        logbook.record(gen=0, nevals=len(invalid_ind), **stats.compile(population))
+        print(logbook.stream)
+        if checkpoint_file:
+            save_checkpoint(checkpoint_file, population, halloffame, logbook, 0)
+        start_gen = 1
+
+    for gen in range(start_gen, ngen + 1):
+        offspring = toolbox.select(population, len(population))
+        offspring = algorithms.varAnd(offspring, toolbox, cxpb, mutpb)
+
+        invalid_ind = [ind for ind in offspring if not ind.fitness.valid]
+        for ind, fit in zip(invalid_ind, toolbox.map(toolbox.evaluate, invalid_ind)):
+            ind.fitness.values = fit
+        halloffame.update(offspring)
+        population[:] = offspring
+
+        logbook.record(gen=gen, nevals=len(invalid_ind), **stats.compile(population))
+        print(logbook.stream)
+        if checkpoint_file and (gen % checkpoint_freq == 0 or gen == ngen):
+            save_checkpoint(checkpoint_file, population, halloffame, logbook, gen)
+
+    return population, logbook
+
+def run_optimization(strategy_name, NGEN=20, POP_SIZE=50, output_file=None, max_workers=None, fitness_cache_file=None,
+                     algorithm="ea_simple", checkpoint_file=None, checkpoint_freq=5):
+    # "ea_simple" runs the genetic algorithm; "cma_es" adapts a sampling distribution
+    # from the ranked Sharpe ratios instead and usually needs fewer backtests to converge.
+    # checkpoint_file makes "ea_simple" runs resumable after a crash.
+    if algorithm == "cma_es":
+        toolbox = setup_cma_toolbox(strategy_name, lambda_=POP_SIZE)
+    elif algorithm == "ea_simple":
+        toolbox = setup_toolbox(strategy_name)
+    else:
+        raise ValueError(f"Unknown optimization algorithm: {algorithm}")
 
     # Load data once
-    data_loader = DataLoader(os.path.join(os.path.dirname(os.path.dirname(__file__)), "data"))
+    # The strategies only read close prices, so skip the other columns (this also shrinks
+    # the shared memory block handed to the workers)
+    data_loader = DataLoader(os.path.join(os.path.dirname(os.path.dirname(__file__)), "data"), columns=["Close"])
 
     # Determine symbols to load based on strategy type
     symbols_to_load = []
@@ -93,10 +314,10 @@ def clamp_individual_param(param_value, param_index, strategy_name):
         print(f"Error: Could not load data for {symbols_to_load}. Skipping optimization.")
         return None, None
 
-    # Register the evaluate function with the loaded data and symbols
-    toolbox.register("evaluate", evaluate_strategy_individual, strategy_name=strategy_name, symbols_to_load=symbols_to_load, data=data)
+    # Register the evaluate function with the symbols; the data reaches the workers
+    # through the pool initializer instead of being pickled with every individual.
+    toolbox.register("evaluate", evaluate_strategy_individual, strategy_name=strategy_name, symbols_to_load=symbols_to_load)
 
-    pop = toolbox.population(n=POP_SIZE)
     hof = tools.HallOfFame(1)
     stats = tools.Statistics(lambda ind: ind.fitness.values)
     stats.register("avg", np.mean)
@@ -108,7 +329,26 @@ def clamp_individual_param(param_value, param_index, strategy_name):
         original_stdout = sys.stdout
         sys.stdout = open(output_file, 'w')
 
-    algorithms.eaSimple(pop, toolbox, cxpb=0.5, mutpb=0.2, ngen=NGEN, stats=stats, halloffame=hof, verbose=True)
+    # Fitness evaluations are independent backtests, so spread them over worker processes.
+    # The workers attach to one shared copy of the price data instead of each receiving a pickle.
+    # Offspring often repeat parameter sets already seen, so fitnesses are cached in this
+    # process by parameter tuple (and optionally persisted between runs).
+    fitness_cache = load_fitness_cache(fitness_cache_file, strategy_name, symbols_to_load)
+    data_shm, data_spec = share_dataframe(data)
+    try:
+        with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count(), initializer=init_worker, initargs=(data_spec,)) as executor:
+            toolbox.register("map", cached_map(executor.map, fitness_cache))
+            if algorithm == "cma_es":
+                algorithms.eaGenerateUpdate(toolbox, ngen=NGEN, stats=stats, halloffame=hof, verbose=True)
+            else:
+                pop = toolbox.population(n=POP_SIZE)
+                ea_simple_checkpointed(pop, toolbox, cxpb=0.5, mutpb=0.2, ngen=NGEN, stats=stats, halloffame=hof,
+                                       checkpoint_file=checkpoint_file, checkpoint_freq=checkpoint_freq)
+    finally:
+        data_shm.close()
+        data_shm.unlink()
+        if fitness_cache_file:
+            save_fitness_cache(fitness_cache_file, strategy_name, symbols_to_load, fitness_cache)
 
     if output_file:
         sys.stdout.close()
@@ -1,7 +1,8 @@
 import os
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
 import yaml
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 from src.backtesting.engine import BacktestingEngine
 from src.reporting.performance import PerformanceCalculator
 from src.strategies.moving_average_crossover import MovingAverageCrossover
@@ -9,13 +10,67 @@ from src.strategies.rsi_strategy import RSIStrategy
 from src.strategies.mean_reversion import MeanReversion
 from src.strategies.lstm_strategy import LSTMStrategy
 from src.strategies.pairs_trading_strategy import PairsTradingStrategy
+from src.data.data_loader import DataLoader
 import json
 
-def run_backtest_for_strategy(strategy_class, strategy_params, symbols: List[str], initial_cash, data_path):
+def equity_curve_payload(equity: pd.Series) -> Dict[str, List]:
+    """
+    Builds the serializable equity curve from an equity Series.
+
+    Returns:
+        A dict with epoch-millisecond timestamps under "index" and equity values under "equity".
+    """
+    return {
+        "index": equity.index.as_unit("ms").asi8.tolist(),
+        "equity": equity.to_numpy().tolist()
+    }
+
+def load_cached_data(data_cache: Dict[Tuple[str, ...], Optional[pd.DataFrame]], symbols: List[str], data_path) -> Optional[pd.DataFrame]:
+    """
+    Loads the data for a set of symbols, parsing the CSVs only on the first request.
+
+    Args:
+        data_cache: Cache of loaded DataFrames keyed by the tuple of symbols.
+        symbols: The symbols to load.
+        data_path: The path to the data directory.
+
+    Returns:
+        The merged DataFrame, or None if loading failed.
+    """
+    key = tuple(symbols)
+    if key not in data_cache:
+        # The strategies only read close prices
+        data_cache[key] = DataLoader(data_path, columns=["Close"]).load_multiple_csvs(symbols)
+    return data_cache[key]
+
+# Data shared with worker processes, set once per worker by init_worker
+_worker_data_cache: Dict[Tuple[str, ...], Optional[pd.DataFrame]] = {}
+
+def init_worker(data_cache: Dict[Tuple[str, ...], Optional[pd.DataFrame]]):
+    """
+    Installs the preloaded market data in a worker process.
+
+    Args:
+        data_cache: Loaded DataFrames keyed by the tuple of symbols.
+    """
+    global _worker_data_cache
+    _worker_data_cache = data_cache
+
+def run_backtest_job(strategy_class, strategy_params, symbols: List[str], initial_cash, data_path):
+    """
+    Runs a single backtest in a worker process against the preloaded data.
+    """
+    return run_backtest_for_strategy(strategy_class, strategy_params, symbols, initial_cash, data_path, _worker_data_cache)
+
+def run_backtest_for_strategy(strategy_class, strategy_params, symbols: List[str], initial_cash, data_path, data_cache=None):
     strategy_name = strategy_class.__name__
     print(f"\n--- Running Backtest for {strategy_name} on {symbols} ---")
     engine = BacktestingEngine(initial_cash=initial_cash, data_path=data_path)
-    data = engine.load_data(symbols)
+    if data_cache is None:
+        data = engine.load_data(symbols)
+    else:
+        data = load_cached_data(data_cache, symbols, data_path)
+        engine.set_data(data)
 
     if data is None or data.empty:
         print(f"Could not load data for {symbols}. Skipping backtest.\n")
@@ -32,15 +87,17 @@ def run_backtest_for_strategy(strategy_class, strategy_params, symbols: List[str
     
     engine.set_strategy(strategy)
 
-    equity_curve, trades = engine.run_backtest()
+    result = engine.run_backtest()
 
-    if equity_curve and trades:
-        performance_calculator = PerformanceCalculator(equity_curve, trades, engine.portfolio_manager.closed_trades)
+    if result is not None and len(result[0][1]) and len(result[1]):
+        equity = engine.portfolio_manager.equity_series()
+        trades = engine.portfolio_manager.trades
+        performance_calculator = PerformanceCalculator(equity, trades, engine.portfolio_manager.closed_trade_array())
         performance_report = performance_calculator.generate_performance_report()
         print(f"Performance Report for {strategy_name} on {symbols}:")
         for metric, value in performance_report.items():
             print(f"  {metric}: {value:.4f}")
-        return equity_curve, trades, performance_report
+        return equity_curve_payload(equity), trades, performance_report
     else:
         print(f"No equity curve or trades generated for {strategy_name} on {symbols}.\n")
         return None, None, None
@@ -66,6 +123,7 @@ if __name__ == "__main__":
 
     all_results = {}
     performance_summaries = {}
+    jobs = []
 
     for strategy_config in config['strategies']:
         strategy_name = list(strategy_config.keys())[0]
@@ -83,21 +141,35 @@ if __name__ == "__main__":
             if report_key_symbols not in all_results:
                 all_results[report_key_symbols] = {}
                 performance_summaries[report_key_symbols] = {}
-
-            equity_curve_list, trades, performance_report = run_backtest_for_strategy(
-                strategy_class, strategy_params, symbols, initial_cash, data_path
-            )
-            if equity_curve_list is not None and performance_report is not None:
-                equity_curve_df = pd.DataFrame(equity_curve_list).set_index("timestamp")
+            jobs.append((report_key_symbols, strategy_name, strategy_class, strategy_params, symbols))
+
+    # Every strategy runs over the same tickers, so parse each CSV set once up front
+    # and share the DataFrames with the workers.
+    data_cache = {}
+    for _, _, _, _, symbols in jobs:
+        load_cached_data(data_cache, symbols, data_path)
+
+    # Backtests are independent and CPU-bound, so run them in separate processes.
+    max_workers = min(len(jobs), os.cpu_count() or 1) or 1
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=init_worker, initargs=(data_cache,)) as executor:
+        futures = [
+            executor.submit(run_backtest_job, strategy_class, strategy_params, symbols, initial_cash, data_path)
+            for _, _, strategy_class, strategy_params, symbols in jobs
+        ]
+        # Collect in submission order so the output files keep the config order
+        for (report_key_symbols, strategy_name, _, _, _), future in zip(jobs, futures):
+            equity_curve, trades, performance_report = future.result()
+            if equity_curve is not None and performance_report is not None:
                 all_results[report_key_symbols][strategy_name] = {
-                    "equity_curve": equity_curve_df.to_json(orient='split'),
+                    "equity_curve": equity_curve,
                     "performance_report": performance_report
                 }
                 performance_summaries[report_key_symbols][strategy_name] = performance_report
 
     output_file = os.path.join(os.path.dirname(os.path.dirname(__file__)), "reports", "backtest_results.json")
+    # No indent: pretty-printing forces the pure-Python encoder and bloats the file
     with open(output_file, "w") as f:
-        json.dump(all_results, f, indent=4)
+        json.dump(all_results, f)
     print(f"\n--- All Backtests Completed. Results saved to {output_file} ---")
 
     performance_summary_file = os.path.join(os.path.dirname(os.path.dirname(__file__)), "reports", "performance_summary.json")
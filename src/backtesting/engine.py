@@ -1,8 +1,10 @@
+import numpy as np
 import pandas as pd
 from src.data.data_loader import DataLoader
 from src.portfolio.manager import PortfolioManager
+from src.utils.jit import NUMBA_AVAILABLE
 import logging
-from typing import Optional, Tuple, List, Dict, Any
+from typing import Optional, Tuple, List, Any
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
@@ -10,16 +12,22 @@ class BacktestingEngine:
     """
     Core backtesting engine that simulates trades and manages the backtesting process.
     """
-    def __init__(self, initial_cash: float, data_path: str):
+    def __init__(self, initial_cash: float, data_path: str, price_dtype: Optional[str] = None):
         """
         Initializes the BacktestingEngine.
 
         Args:
             initial_cash: The initial cash for the portfolio.
             data_path: The path to the data directory.
+            price_dtype: Optional float dtype (e.g. 'float32') of the price feed. Loaded
+                data and the close matrix read by the bar loop use it, halving their memory
+                traffic; cash, quantities and equity are always accumulated in float64.
+                By default prices are float64. Vectorized strategies run the compiled
+                kernel on their own float64 close array, so it does not apply to them.
         """
         self.portfolio_manager: PortfolioManager = PortfolioManager(initial_cash)
-        self.data_loader: DataLoader = DataLoader(data_path)
+        self.data_loader: DataLoader = DataLoader(data_path, dtype=price_dtype)
+        self.price_dtype: np.dtype = np.dtype(price_dtype or np.float64)
         self.strategy: Optional[Any] = None  # Type hint for strategy object
         self.data: Optional[pd.DataFrame] = None
 
@@ -38,6 +46,18 @@ class BacktestingEngine:
             logging.info(f"Data loaded successfully for {symbols}")
         return self.data
 
+    def set_data(self, data: pd.DataFrame):
+        """
+        Sets already loaded historical data for backtesting.
+
+        Lets callers that run several backtests over the same symbols parse the CSVs
+        once and share the DataFrame instead of calling load_data for every run.
+
+        Args:
+            data: A pandas DataFrame in the format returned by DataLoader.load_multiple_csvs.
+        """
+        self.data = data
+
     def set_strategy(self, strategy: Any):
         """
         Sets the trading strategy to be used for backtesting.
@@ -48,7 +68,7 @@ class BacktestingEngine:
         self.strategy = strategy
         logging.info(f"Strategy {strategy.__class__.__name__} set.")
 
-    def run_backtest(self) -> Optional[Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]]:
+    def run_backtest(self) -> Optional[Tuple[Tuple[np.ndarray, np.ndarray], np.ndarray]]:
         """
         Runs the backtest simulation.
 
@@ -56,8 +76,10 @@ class BacktestingEngine:
         trades based on the defined strategy.
 
         Returns:
-            A tuple containing the equity curve (list of dicts) and trades (list of dicts),
-            or None if data or strategy is not set.
+            A tuple of the equity curve as (timestamps, equity) arrays and the trades as a
+            structured array, or None if data or strategy is not set. The list-of-dict views
+            are left to the portfolio manager's equity_curve and trades properties, so
+            callers that only need the numbers do not build one dict per bar.
         """
         if self.data is None:
             logging.error("No data loaded. Please load data before running backtest.")
@@ -72,21 +94,104 @@ class BacktestingEngine:
         # Pass the entire data to the strategy, and let the strategy handle slicing
         self.strategy.set_data(self.data)
 
-        for i, (index, row) in enumerate(self.data.iterrows()):
-            current_prices = {}
-            for col in self.data.columns:
-                if col.startswith("Close_"):
-                    symbol = col.replace("Close_", "")
-                    current_prices[symbol] = row[col]
+        if getattr(self.strategy, 'vectorized', False) and NUMBA_AVAILABLE:
+            # The compiled kernel fuses portfolio updates, stop-loss checks and signals
+            # into a single pass; without Numba the bar-by-bar loop below is faster.
+            result = self.strategy.run_vectorized(self.portfolio_manager.cash)
+            self.portfolio_manager.record_simulation(self.strategy.symbol, self.data.index, *result)
+            logging.info("Backtest finished.")
+            return self.portfolio_manager.equity_ndarray(), self.portfolio_manager.trade_array()
+
+        # Extract the close columns and index once so the loops below work on plain
+        # Python scalars instead of boxing every bar into a pandas Series.
+        close_cols = [col for col in self.data.columns if col.startswith("Close_")]
+        symbols = [col.replace("Close_", "") for col in close_cols]
+        # Only the read-only price feed follows price_dtype; the portfolio multiplies it by
+        # float64 quantities, so equity is still accumulated in float64.
+        close_matrix = DataLoader.row_major_array(self.data, close_cols, dtype=self.price_dtype)
+        # datetime64 values; Index.tolist() would box every bar into a pandas Timestamp up front
+        timestamps = self.data.index.to_numpy()
+        strategy_symbol = getattr(self.strategy, 'symbol', None)
+        strategy_col = symbols.index(strategy_symbol) if strategy_symbol in symbols else None
+
+        # The index, not the list, so equity_ndarray can hand out its datetime64 values
+        self.portfolio_manager.allocate_equity_curve(self.data.index, symbols)
+
+        active_bars = self.strategy.active_bars() if strategy_col is not None else None
+        if active_bars is not None:
+            self._run_active_bars(close_matrix, timestamps, strategy_col, active_bars)
+        else:
+            self._run_all_bars(close_matrix, timestamps, strategy_col)
+
+        logging.info("Backtest finished.")
+        return self.portfolio_manager.equity_ndarray(), self.portfolio_manager.trade_array()
+
+    def _run_all_bars(self, close_matrix: np.ndarray, timestamps: np.ndarray, strategy_col: Optional[int]):
+        """
+        Runs the strategy on every bar.
 
-            self.portfolio_manager.update_portfolio(current_prices, index)
+        Args:
+            close_matrix: Close prices, one column per symbol.
+            timestamps: The timestamp of every bar.
+            strategy_col: The column of the strategy's symbol, or None if it has no close column.
+        """
+        close_rows = close_matrix.tolist()
+        # Bound once: the loop body then resolves these as locals instead of repeating
+        # the attribute lookups on every bar
+        strategy = self.strategy
+        record_equity = self.portfolio_manager.record_equity
+        check_stop_loss = strategy.check_stop_loss
+        on_bar_fast = strategy.on_bar_fast
+        for i in range(len(timestamps)):
+            timestamp = timestamps[i]
+            prices = close_rows[i]
+
+            record_equity(i, prices)
+            if strategy_col is None:
+                strategy.on_bar(i, self.data.iloc[i])
+                continue
             # Check for stop-loss before executing strategy's on_bar logic
             # This assumes the strategy is managing a single primary symbol for stop-loss
-            if hasattr(self.strategy, 'symbol') and self.strategy.symbol in current_prices:
-                self.strategy.check_stop_loss(current_prices[self.strategy.symbol])
-            self.strategy.on_bar(i, row) # Pass index 'i' and the full row of data
+            close = prices[strategy_col]
+            # Stop-loss orders are stamped with the bar that triggered them
+            strategy.current_index = i
+            check_stop_loss(close)
+            on_bar_fast(i, close, timestamp)
+
+    def _run_active_bars(self, close_matrix: np.ndarray, timestamps: np.ndarray, strategy_col: int,
+                         active_bars: np.ndarray):
+        """
+        Runs the strategy only on bars where it can act.
 
-        logging.info("Backtest finished.")
-        return self.portfolio_manager.equity_curve, self.portfolio_manager.trades
+        A bar is visited if it is one of the strategy's active bars or the stop-loss
+        would trigger on it. Positions cannot change in between, so the equity of the
+        skipped bars is filled in with one vectorized pass per gap.
 
+        Args:
+            close_matrix: Close prices, one column per symbol.
+            timestamps: The timestamp of every bar.
+            strategy_col: The column of the strategy's symbol.
+            active_bars: Sorted indices of the bars on which the strategy may trade.
+        """
+        close = close_matrix[:, strategy_col]
+        num_bars = len(timestamps)
+        num_active = len(active_bars)
+        start = 0
+        while start < num_bars:
+            pos = int(np.searchsorted(active_bars, start))
+            next_signal = int(active_bars[pos]) if pos < num_active else num_bars
+            i = min(next_signal, self.strategy.next_stop_loss_bar(close, start))
+            if i > start:
+                self.portfolio_manager.record_equity_range(start, i, close_matrix)
+            if i >= num_bars:
+                break
+
+            prices = close_matrix[i].tolist()
+            self.portfolio_manager.record_equity(i, prices)
+            price = prices[strategy_col]
+            # Stop-loss orders are stamped with the bar that triggered them
+            self.strategy.current_index = i
+            self.strategy.check_stop_loss(price)
+            self.strategy.on_bar_fast(i, price, timestamps[i])
+            start = i + 1
 
@@ -1,22 +1,191 @@
+import numpy as np
 import pandas as pd
 import os
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Tuple
 import logging
 
+try:
+    import pyarrow.csv as pa_csv
+except ImportError:  # pyarrow is optional; the pandas parser is used without it
+    pa_csv = None
+
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+# Canonical column order of a loaded price file
+OHLCV_COLUMNS: List[str] = ["Open", "High", "Low", "Close", "Volume"]
+
 class DataLoader:
     """
     Handles loading historical financial data from various sources.
     """
-    def __init__(self, data_path: str):
+    def __init__(self, data_path: str, dtype: Optional[str] = None, backend: str = 'pandas', cache_dir: Optional[str] = None,
+                 columns: Optional[List[str]] = None):
         """
         Initializes the DataLoader with the path to the data directory.
 
         Args:
             data_path: The absolute path to the directory containing data files.
+            dtype: Optional float dtype (e.g. 'float32') to downcast price columns to.
+                Halves memory per symbol at the cost of precision beyond ~7 significant
+                digits. By default pandas' float64 columns are kept.
+            backend: CSV parser to use, either 'pandas' or 'pyarrow'. The multithreaded
+                pyarrow reader is considerably faster on large files; if pyarrow is not
+                installed the pandas parser is used instead.
+            cache_dir: Optional directory in which to keep a parsed .parquet copy of each
+                CSV, read instead of the CSV while it is newer than it. Requires a Parquet
+                engine (pyarrow); without one the CSV is always parsed. By default nothing
+                is cached and nothing is written.
+            columns: Optional subset of the price columns to load (e.g. ['Close']). Other
+                columns are skipped by the parsers instead of being parsed and dropped.
+                By default every column is loaded.
         """
         self.data_path = data_path
+        self.dtype = dtype
+        self.backend = backend
+        self.cache_dir = cache_dir
+        self.columns = columns
+        # Merged DataFrames already built by load_multiple_csvs, keyed by the symbols requested
+        self._combined_cache: Dict[Tuple[str, ...], pd.DataFrame] = {}
+        if backend == 'pyarrow' and pa_csv is None:
+            logging.warning("pyarrow is not installed; falling back to the pandas CSV parser.")
+            self.backend = 'pandas'
+
+    @staticmethod
+    def _ordered(columns: List[str]) -> List[str]:
+        """
+        Puts columns in the canonical OHLCV order, followed by any other columns.
+
+        Args:
+            columns: The column names.
+
+        Returns:
+            The reordered column names.
+        """
+        ordered = [col for col in OHLCV_COLUMNS if col in columns]
+        return ordered + [col for col in columns if col not in ordered]
+
+    @staticmethod
+    def _header_columns(full_path: str, columns: Optional[List[str]]) -> Optional[List[str]]:
+        """
+        Returns the names of the CSV columns to parse: the date column plus the requested ones.
+
+        Args:
+            full_path: The path of the CSV file.
+            columns: The requested price columns, or None for all of them.
+
+        Returns:
+            The column names to parse, or None to parse every column.
+        """
+        if columns is None:
+            return None
+        with open(full_path, 'r') as f:
+            header = f.readline().rstrip('\r\n').split(',')
+        return [header[0]] + [col for col in header[1:] if col in columns]
+
+    def _read_csv_pyarrow(self, full_path: str, include_columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Reads a CSV file with pyarrow, skipping the two metadata rows below the header.
+
+        Args:
+            full_path: The path of the CSV file.
+            include_columns: Optional names of the columns to parse, including the date column.
+
+        Returns:
+            A pandas DataFrame indexed by the parsed dates in the first column.
+        """
+        convert_options = pa_csv.ConvertOptions(include_columns=include_columns) if include_columns else None
+        table = pa_csv.read_csv(full_path, read_options=pa_csv.ReadOptions(skip_rows_after_names=2),
+                                convert_options=convert_options)
+        df = table.to_pandas()
+        df = df.set_index(df.columns[0])
+        df.index = pd.to_datetime(df.index)
+        return df
+
+    def _downcast(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Downcasts float columns to the configured dtype and integer columns (e.g. Volume)
+        to the smallest integer type that holds them.
+
+        Args:
+            df: The DataFrame to downcast.
+
+        Returns:
+            The downcast DataFrame.
+        """
+        for col in df.select_dtypes(include='float').columns:
+            df[col] = df[col].astype(self.dtype)
+        for col in df.select_dtypes(include='integer').columns:
+            df[col] = pd.to_numeric(df[col], downcast='integer')
+        return df
+
+    @staticmethod
+    def column_arrays(df: pd.DataFrame, columns: List[str]) -> Dict[str, np.ndarray]:
+        """
+        Returns each column as its own contiguous 1D array.
+
+        Suited to kernels that sweep one column over all bars (rolling indicators).
+
+        Args:
+            df: The DataFrame to read from.
+            columns: The columns to extract.
+
+        Returns:
+            A dict mapping column names to contiguous arrays.
+        """
+        return {col: np.ascontiguousarray(df[col].to_numpy()) for col in columns}
+
+    @staticmethod
+    def row_major_array(df: pd.DataFrame, columns: List[str], dtype: Optional[str] = None) -> np.ndarray:
+        """
+        Returns the given columns as a single C-contiguous 2D array.
+
+        Suited to loops that read several columns of the same bar, e.g. arr[i, col];
+        each bar's values are adjacent in memory.
+
+        Args:
+            df: The DataFrame to read from.
+            columns: The columns to extract, in column order of the result.
+            dtype: Optional dtype of the result (e.g. 'float32').
+
+        Returns:
+            A 2D array of shape (len(df), len(columns)).
+        """
+        return np.ascontiguousarray(df[columns].to_numpy(dtype=dtype))
+
+    def _read_parquet_cache(self, csv_path: str, parquet_path: str) -> Optional[pd.DataFrame]:
+        """
+        Reads the cached copy of a CSV file if it is up to date.
+
+        Args:
+            csv_path: The path of the CSV file.
+            parquet_path: The path of its cached copy.
+
+        Returns:
+            The cached DataFrame, or None if there is no usable cache.
+        """
+        try:
+            if os.path.getmtime(parquet_path) < os.path.getmtime(csv_path):
+                return None
+            if self.columns is None:
+                return pd.read_parquet(parquet_path)
+            # Parquet is columnar, so only the requested columns are read from disk
+            return pd.read_parquet(parquet_path, columns=self._ordered(self.columns))
+        except (OSError, ImportError, ValueError):
+            return None
+
+    def _write_parquet_cache(self, df: pd.DataFrame, parquet_path: str):
+        """
+        Writes the parsed copy of a CSV file. Failures only disable the cache.
+
+        Args:
+            df: The parsed DataFrame.
+            parquet_path: The path to write to.
+        """
+        try:
+            os.makedirs(os.path.dirname(parquet_path), exist_ok=True)
+            df.to_parquet(parquet_path)
+        except (OSError, ImportError, ValueError) as e:
+            logging.debug(f"Could not write Parquet cache {parquet_path}: {e}")
 
     def load_csv(self, file_name: str) -> Optional[pd.DataFrame]:
         """
@@ -31,9 +200,28 @@ class DataLoader:
             A pandas DataFrame containing the loaded data, or None if an error occurs.
         """
         full_path = os.path.join(self.data_path, file_name)
+        parquet_path = None
+        if self.cache_dir is not None:
+            parquet_path = os.path.join(self.cache_dir, os.path.splitext(file_name)[0] + ".parquet")
         try:
-            # Skip the first two rows and read the 'Date' column as index
-            df = pd.read_csv(full_path, index_col=0, parse_dates=True, skiprows=[1, 2])
+            df = self._read_parquet_cache(full_path, parquet_path) if parquet_path else None
+            if df is None:
+                # The cache must hold every column, so only skip columns when not writing one
+                include_columns = None if parquet_path else self._header_columns(full_path, self.columns)
+                if self.backend == 'pyarrow':
+                    df = self._read_csv_pyarrow(full_path, include_columns)
+                else:
+                    # Skip the first two rows and read the 'Date' column as index
+                    df = pd.read_csv(full_path, index_col=0, parse_dates=True, skiprows=[1, 2], usecols=include_columns)
+                # Fix the column order and materialize fresh column blocks so every
+                # column is a contiguous array regardless of how the parser laid it out.
+                df = df[self._ordered(list(df.columns))].copy()
+                if parquet_path:
+                    self._write_parquet_cache(df, parquet_path)
+                    if self.columns is not None:
+                        df = df[self._ordered([col for col in df.columns if col in self.columns])]
+            if self.dtype is not None:
+                df = self._downcast(df)
             logging.info(f"Successfully loaded data from {full_path}")
             return df
         except FileNotFoundError:
@@ -53,8 +241,13 @@ class DataLoader:
         Returns:
             A pandas DataFrame with combined data, or None if loading fails.
             Columns will be renamed to include the symbol (e.g., 'Close_AAPL').
+            Repeated calls with the same symbols return the same DataFrame object.
         """
-        combined_df = pd.DataFrame()
+        cache_key = tuple(symbols)
+        if cache_key in self._combined_cache:
+            return self._combined_cache[cache_key]
+
+        frames = []
         for symbol in symbols:
             file_name = f"{symbol}.csv"
             df = self.load_csv(file_name)
@@ -63,18 +256,17 @@ class DataLoader:
                 continue
             
             # Rename columns to include symbol
-            df = df.add_suffix(f"_{symbol}")
-            
-            if combined_df.empty:
-                combined_df = df
-            else:
-                combined_df = pd.merge(combined_df, df, left_index=True, right_index=True, how='outer')
+            frames.append(df.add_suffix(f"_{symbol}"))
         
-        if combined_df.empty:
+        if not frames:
             logging.error("No data loaded for any of the symbols.")
             return None
 
+        # Align all symbols on the union of their dates in a single pass
+        combined_df = pd.concat(frames, axis=1, join='outer') if len(frames) > 1 else frames[0]
+
         # Sort by index (Date) and forward fill any missing values introduced by merging
         combined_df = combined_df.sort_index().ffill()
         logging.info(f"Successfully loaded and combined data for symbols: {symbols}")
+        self._combined_cache[cache_key] = combined_df
         return combined_df
\ No newline at end of file
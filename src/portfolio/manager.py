@@ -1,4 +1,64 @@
-from typing import Dict, List, Any
+import logging
+import math
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass
+from typing import Dict, List, Any, Sequence, Tuple
+# The accounting kernel lives next to the simulation kernel that calls it: Numba's on-disk
+# cache only checks the source file of the cached function, so keeping both in one file
+# means an edit to apply_trade also invalidates the cached simulate_signals.
+from src.strategies._signal_kernel import apply_trade
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class Position:
+    """
+    A snapshot of an open position in a single symbol. Negative quantities are short positions.
+    """
+    quantity: float = 0.0
+    avg_price: float = 0.0
+
+
+# One row per executed trade; slot indexes PortfolioManager.symbols and side is 1 for buys, -1 for sells
+TRADE_DTYPE = np.dtype([
+    ('slot', np.int32),
+    ('side', np.int8),
+    ('quantity', np.float64),
+    ('price', np.float64),
+    ('commission', np.float64),
+    ('timestamp', 'datetime64[ns]'),
+])
+
+# One row per trade that reduced or closed a position, with its PnL net of commission
+CLOSED_TRADE_DTYPE = np.dtype([
+    ('slot', np.int32),
+    ('pnl', np.float64),
+    ('timestamp', 'datetime64[ns]'),
+])
+
+
+def _reserve(log: np.ndarray, used: int, count: int) -> np.ndarray:
+    """
+    Makes room for `count` more rows after the first `used` rows of a log array.
+
+    Args:
+        log: The structured log array.
+        used: The number of valid rows in the log.
+        count: The number of rows about to be appended.
+
+    Returns:
+        The log itself if it is large enough, otherwise a larger copy of it.
+    """
+    needed = used + count
+    if needed <= len(log):
+        return log
+    # Grow geometrically so appending stays amortized O(1)
+    grown = np.empty(max(needed, 2 * len(log)), dtype=log.dtype)
+    grown[:used] = log[:used]
+    return grown
+
 
 class PortfolioManager:
     """
@@ -13,23 +73,261 @@ class PortfolioManager:
         """
         self.initial_cash: float = initial_cash
         self.cash: float = initial_cash
-        self.positions: Dict[str, Dict[str, Any]] = {}
-        self.equity_curve: List[Dict[str, Any]] = []
-        self.trades: List[Dict[str, Any]] = []
-        self.closed_trades: List[Dict[str, Any]] = []
+        # Positions are stored as parallel arrays indexed by a per-symbol slot. The arrays
+        # may be longer than symbols; unused slots stay zero, so they never count as held.
+        self.symbols: List[str] = []
+        self.symbol_index: Dict[str, int] = {}
+        self.quantities: np.ndarray = np.zeros(8, dtype=np.float64)
+        self.avg_prices: np.ndarray = np.zeros(8, dtype=np.float64)
+        # Trade log, grown geometrically; only the first trade_count rows are valid
+        self.trade_log: np.ndarray = np.empty(64, dtype=TRADE_DTYPE)
+        self.trade_count: int = 0
+        self.closed_log: np.ndarray = np.empty(64, dtype=CLOSED_TRADE_DTYPE)
+        self.closed_count: int = 0
+        # Equity storage, preallocated by allocate_equity_curve for the backtest loop and
+        # grown geometrically by update_portfolio
+        self.equity_timestamps: Sequence[Any] = np.empty(0, dtype='datetime64[ns]')
+        self.equity_values: np.ndarray = np.empty(0, dtype=np.float64)
+        self.equity_count: int = 0
+        self.price_columns: Dict[str, int] = {}
+        # (price column, quantity) of every open position that has a price column
+        self.held_columns: List[Tuple[int, float]] = []
+
+    @property
+    def equity_curve(self) -> List[Dict[str, Any]]:
+        """
+        The equity curve as a list of {'timestamp', 'equity'} dicts.
+
+        Built from equity_timestamps and equity_values on every access, so code that
+        only needs the numbers should read the arrays directly.
+        """
+        return [
+            {'timestamp': timestamp, 'equity': value}
+            for timestamp, value in zip(self.equity_timestamps, self.equity_values[:self.equity_count].tolist())
+        ]
+
+    @property
+    def trades(self) -> List[Dict[str, Any]]:
+        """
+        The executed trades as a list of {'symbol', 'type', 'quantity', 'price',
+        'commission', 'timestamp'} dicts.
+
+        Built from trade_log on every access; use trade_array for the numbers.
+        """
+        log = self.trade_log[:self.trade_count]
+        symbols = self.symbols
+        return [
+            {'symbol': symbols[slot], 'type': 'buy' if side > 0 else 'sell', 'quantity': quantity,
+             'price': price, 'commission': commission, 'timestamp': timestamp}
+            for slot, side, quantity, price, commission, timestamp in zip(
+                log['slot'].tolist(), log['side'].tolist(), log['quantity'].tolist(), log['price'].tolist(),
+                log['commission'].tolist(), log['timestamp'])
+        ]
+
+    @property
+    def closed_trades(self) -> List[Dict[str, Any]]:
+        """
+        The trades that reduced or closed a position as a list of {'symbol', 'pnl',
+        'timestamp'} dicts.
+
+        Built from closed_log on every access; use closed_trade_array for the numbers.
+        """
+        log = self.closed_trade_array()
+        symbols = self.symbols
+        return [
+            {'symbol': symbols[slot], 'pnl': pnl, 'timestamp': timestamp}
+            for slot, pnl, timestamp in zip(log['slot'].tolist(), log['pnl'].tolist(), log['timestamp'])
+        ]
+
+    def trade_array(self) -> np.ndarray:
+        """
+        Returns the executed trades as a structured array, without building per-trade dicts.
+
+        Returns:
+            A TRADE_DTYPE array with one row per executed trade.
+        """
+        return self.trade_log[:self.trade_count]
+
+    def closed_trade_array(self) -> np.ndarray:
+        """
+        Returns the closed trades as a structured array, without building per-trade dicts.
+
+        Returns:
+            A CLOSED_TRADE_DTYPE array with one row per closed trade.
+        """
+        return self.closed_log[:self.closed_count]
+
+    def equity_ndarray(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the equity curve as arrays, without building per-bar dicts.
+
+        Returns:
+            A tuple of (timestamps, equity) arrays of equal length.
+        """
+        count = self.equity_count
+        return np.asarray(self.equity_timestamps)[:count], self.equity_values[:count]
+
+    def equity_series(self) -> pd.Series:
+        """
+        Returns the equity curve as a Series indexed by timestamp.
+
+        PerformanceCalculator accepts this directly, which skips building and parsing
+        one dict per bar.
+
+        Returns:
+            A Series of equity values named "equity".
+        """
+        timestamps, equity = self.equity_ndarray()
+        return pd.Series(equity, index=pd.DatetimeIndex(timestamps), name="equity")
+
+    @property
+    def positions(self) -> Dict[str, Position]:
+        """
+        The open positions keyed by symbol.
+
+        Built from the position arrays on access; modifying the returned objects does
+        not change the portfolio.
+        """
+        held = np.flatnonzero(self.quantities)
+        return {
+            self.symbols[slot]: Position(quantity, avg_price)
+            for slot, quantity, avg_price in zip(held.tolist(), self.quantities[held].tolist(), self.avg_prices[held].tolist())
+        }
+
+    def open_quantities(self) -> Dict[str, float]:
+        """
+        Returns the quantity of every open position keyed by symbol.
+
+        Like positions, but reads only the quantity array and builds no Position objects.
+
+        Returns:
+            A dict mapping each held symbol to its signed quantity.
+        """
+        held = np.flatnonzero(self.quantities)
+        return dict(zip([self.symbols[slot] for slot in held.tolist()], self.quantities[held].tolist()))
+
+    def position_of(self, symbol: str) -> Tuple[float, float]:
+        """
+        Returns the quantity and average entry price held in a symbol.
+
+        Reads the position arrays directly, without building Position objects.
+
+        Args:
+            symbol: The symbol to look up.
+
+        Returns:
+            A tuple of (quantity, avg_price); (0.0, 0.0) if the symbol was never traded.
+        """
+        slot = self.symbol_index.get(symbol)
+        if slot is None:
+            return 0.0, 0.0
+        return float(self.quantities[slot]), float(self.avg_prices[slot])
+
+    def _slot(self, symbol: str) -> int:
+        """
+        Returns the array slot of a symbol, adding one if the symbol is new.
+
+        Args:
+            symbol: The symbol to look up.
+
+        Returns:
+            The index of the symbol in the position arrays.
+        """
+        slot = self.symbol_index.get(symbol)
+        if slot is None:
+            slot = self.symbol_index[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+            if slot == len(self.quantities):
+                # Double the capacity so adding symbols stays amortized O(1)
+                self.quantities = np.concatenate((self.quantities, np.zeros(max(8, slot))))
+                self.avg_prices = np.concatenate((self.avg_prices, np.zeros(max(8, slot))))
+        return slot
+
+    def _update_held_columns(self):
+        """
+        Rebuilds the list of open positions used by the per-bar equity calculation.
+        """
+        self.held_columns = [
+            (self.price_columns[self.symbols[slot]], float(self.quantities[slot]))
+            for slot in np.flatnonzero(self.quantities).tolist()
+            if self.symbols[slot] in self.price_columns
+        ]
 
     def update_portfolio(self, current_price: Dict[str, float], timestamp: Any):
         """
-        Updates the portfolio's equity curve based on current market prices.
+        Appends the portfolio's equity at the given prices to the equity curve.
+
+        Not meant to be mixed with allocate_equity_curve/record_equity in one run.
 
         Args:
             current_price: A dictionary mapping symbols to their current prices.
             timestamp: The current timestamp of the market data.
         """
+        held = np.flatnonzero(self.quantities)
+        prices = [current_price.get(self.symbols[slot], 0) for slot in held.tolist()]
+        current_equity: float = self.cash + float(np.dot(self.quantities[held], prices))
+        count = self.equity_count
+        if count == len(self.equity_values):
+            # Grow both arrays geometrically so repeated calls stay amortized O(1)
+            capacity = max(16, 2 * count)
+            values = np.empty(capacity, dtype=np.float64)
+            values[:count] = self.equity_values[:count]
+            timestamps = np.empty(capacity, dtype='datetime64[ns]')
+            timestamps[:count] = np.asarray(self.equity_timestamps[:count], dtype='datetime64[ns]')
+            self.equity_values = values
+            self.equity_timestamps = timestamps
+        self.equity_timestamps[count] = np.datetime64(timestamp, 'ns')
+        self.equity_values[count] = current_equity
+        self.equity_count += 1
+
+    def allocate_equity_curve(self, timestamps: Sequence[Any], symbols: Sequence[str]):
+        """
+        Preallocates the equity curve for a backtest over a known set of bars.
+
+        Args:
+            timestamps: The timestamps of every bar in the backtest.
+            symbols: The symbols in the order their prices are passed to record_equity.
+        """
+        self.equity_timestamps = timestamps
+        self.equity_values = np.empty(len(timestamps), dtype=np.float64)
+        self.equity_count = len(timestamps)
+        self.price_columns = {symbol: col for col, symbol in enumerate(symbols)}
+        self._update_held_columns()
+
+    def record_equity(self, index: int, prices: Sequence[float]):
+        """
+        Writes the portfolio equity for a bar into the preallocated equity curve.
+
+        Equivalent to update_portfolio, but takes prices positionally (aligned with the
+        symbols given to allocate_equity_curve) so no per-bar dict has to be built.
+
+        Args:
+            index: The integer index of the bar.
+            prices: The current prices, one per symbol.
+        """
         current_equity: float = self.cash
-        for symbol, position in self.positions.items():
-            current_equity += position['quantity'] * current_price.get(symbol, 0)
-        self.equity_curve.append({'timestamp': timestamp, 'equity': current_equity})
+        for col, quantity in self.held_columns:
+            current_equity += quantity * prices[col]
+        self.equity_values[index] = current_equity
+
+    def record_equity_range(self, start: int, stop: int, price_matrix: np.ndarray):
+        """
+        Writes the portfolio equity for a run of bars in which no trade occurs.
+
+        Positions are constant over such a run, so the equity is computed for all bars
+        at once instead of calling record_equity per bar.
+
+        Args:
+            start: The index of the first bar (inclusive).
+            stop: The index of the last bar (exclusive).
+            price_matrix: A 2D array of prices, one column per symbol, aligned with the
+                symbols given to allocate_equity_curve.
+        """
+        equity = self.equity_values[start:stop]
+        equity.fill(self.cash)
+        if self.held_columns:
+            cols, quantities = zip(*self.held_columns)
+            equity += price_matrix[start:stop, list(cols)] @ np.asarray(quantities)
 
     def execute_trade(self, trade: Dict[str, Any]) -> bool:
         """
@@ -43,79 +341,92 @@ class PortfolioManager:
             True if the trade was successful, False otherwise.
         """
         symbol: str = trade['symbol']
-        trade_type: str = trade['type']
         quantity: float = trade['quantity']
-        price: float = trade['price']
         commission: float = trade.get('commission', 0.0)
 
-        # Ensure the symbol exists in positions, initialize if not
-        if symbol not in self.positions:
-            self.positions[symbol] = {'quantity': 0.0, 'avg_price': 0.0}
-
-        current_quantity: float = self.positions[symbol]['quantity']
-        current_avg_price: float = self.positions[symbol]['avg_price']
-
-        if trade_type == 'buy':
-            cost: float = quantity * price + commission
-            if self.cash < cost:
-                print(f"Insufficient cash to buy {quantity} of {symbol}")
-                return False
-
-            self.cash -= cost
-
-            if current_quantity >= 0:  # Existing long position or no position
-                new_total_value = (current_quantity * current_avg_price) + (quantity * price)
-                new_total_quantity = current_quantity + quantity
-                self.positions[symbol]['quantity'] = new_total_quantity
-                self.positions[symbol]['avg_price'] = new_total_value / new_total_quantity if new_total_quantity > 0 else 0.0
-            else:  # Existing short position (current_quantity < 0)
-                # Buying to cover short
-                if abs(current_quantity) <= quantity:  # Fully or over-covered short, potentially flipping to long
-                    covered_quantity = abs(current_quantity)
-                    pnl_from_cover = (current_avg_price - price) * covered_quantity
-                    self.cash += pnl_from_cover  # Realize PnL from covering short
-
-                    remaining_buy_quantity = quantity - covered_quantity
-                    self.positions[symbol]['quantity'] = remaining_buy_quantity
-                    self.positions[symbol]['avg_price'] = price  # New average for the new long position
-                else:  # Partially covered short, still short
-                    self.positions[symbol]['quantity'] += quantity
-                    # avg_price for short remains the same as it's the average short entry price
-
-        elif trade_type == 'sell':
-            # Selling can reduce long or create/increase short
-            if current_quantity > 0:  # Existing long position
-                if current_quantity <= quantity:  # Selling to close long or go short
-                    pnl_from_long_close = (price - current_avg_price) * current_quantity
-                    self.cash += pnl_from_long_close - commission  # Realize PnL from closing long
-
-                    remaining_sell_quantity = quantity - current_quantity
-                    self.positions[symbol]['quantity'] = - (quantity - current_quantity) # Remaining quantity is short
-                    if self.positions[symbol]['quantity'] == 0:
-                        self.closed_trades.append({'symbol': symbol, 'pnl': pnl_from_long_close, 'timestamp': trade['timestamp']})
-                        del self.positions[symbol]
-                    else: # Flipped to short
-                        self.positions[symbol]['avg_price'] = price  # New average for the new short position
-                else:  # Reduce long position
-                    self.cash += quantity * price - commission
-                    new_total_value = (current_quantity * current_avg_price) - (quantity * price)
-                    new_total_quantity = current_quantity - quantity
-                    self.positions[symbol]['quantity'] = new_total_quantity
-                    self.positions[symbol]['avg_price'] = new_total_value / new_total_quantity if new_total_quantity > 0 else 0.0
-
-            else:  # No position or existing short position (current_quantity <= 0)
-                # Create or increase short position
-                self.cash += quantity * price - commission
-                new_total_value = (abs(current_quantity) * current_avg_price) + (quantity * price)
-                new_total_quantity = abs(current_quantity) + quantity
-                self.positions[symbol]['quantity'] = -new_total_quantity
-                self.positions[symbol]['avg_price'] = new_total_value / new_total_quantity if new_total_quantity > 0 else 0.0
-        
-        # If quantity becomes zero, remove the position
-        if symbol in self.positions and self.positions[symbol]['quantity'] == 0:
-            del self.positions[symbol]
-
-        self.trades.append(trade)
+        slot = self._slot(symbol)
+        executed, cash, new_quantity, new_avg_price, realized_pnl = apply_trade(
+            trade['type'] == 'buy', float(quantity), float(trade['price']), float(commission), float(self.cash),
+            float(self.quantities[slot]), float(self.avg_prices[slot]))
+        if not executed:
+            logger.debug("Insufficient cash to buy %s of %s", quantity, symbol)
+            return False
+
+        self.cash = cash
+        self.quantities[slot] = new_quantity
+        self.avg_prices[slot] = new_avg_price
+        self._update_held_columns()
+        if not math.isnan(realized_pnl):
+            self._record_closed_trade(slot, realized_pnl, trade)
+
+        self.trade_log = _reserve(self.trade_log, self.trade_count, 1)
+        self.trade_log[self.trade_count] = (slot, 1 if trade['type'] == 'buy' else -1, quantity, trade['price'],
+                                            commission, np.datetime64(trade.get('timestamp'), 'ns'))
+        self.trade_count += 1
         return True
 
+    def _record_closed_trade(self, slot: int, pnl: float, trade: Dict[str, Any]):
+        """
+        Records the realized PnL of a trade that reduced or closed a position.
+
+        Args:
+            slot: The position slot of the traded symbol.
+            pnl: The realized PnL, net of commission.
+            trade: The trade that realized the PnL.
+        """
+        self.closed_log = _reserve(self.closed_log, self.closed_count, 1)
+        self.closed_log[self.closed_count] = (slot, pnl, np.datetime64(trade.get('timestamp'), 'ns'))
+        self.closed_count += 1
+
+    def record_simulation(self, symbol: str, timestamps: Sequence[Any], equity: np.ndarray,
+                          trade_index: np.ndarray, trade_side: np.ndarray, trade_quantity: np.ndarray,
+                          trade_price: np.ndarray, trade_pnl: np.ndarray, num_trades: int,
+                          cash: float, quantity: float, avg_price: float):
+        """
+        Records the outcome of a vectorized single-symbol simulation.
+
+        Rebuilds the equity curve, trade log, closed trades and final position from
+        the arrays produced by a strategy's run_vectorized kernel, so downstream code
+        sees the same structures as after a bar-by-bar backtest.
+
+        Args:
+            symbol: The traded symbol.
+            timestamps: The timestamps of every bar.
+            equity: The equity value at every bar.
+            trade_index: The bar index of each trade.
+            trade_side: 1 for buys and -1 for sells.
+            trade_quantity: The quantity of each trade.
+            trade_price: The execution price of each trade.
+            trade_pnl: The realized PnL of trades that closed a position, NaN otherwise.
+            num_trades: The number of valid entries in the trade arrays.
+            cash: The final cash balance.
+            quantity: The final position quantity.
+            avg_price: The final average entry price.
+        """
+        self.equity_timestamps = timestamps
+        self.equity_values = equity
+        self.equity_count = len(equity)
+        slot = self._slot(symbol)
+        trade_timestamps = np.asarray(timestamps)[trade_index[:num_trades]]
+        self.trade_log = _reserve(self.trade_log, self.trade_count, num_trades)
+        rows = self.trade_log[self.trade_count:self.trade_count + num_trades]
+        rows['slot'] = slot
+        rows['side'] = trade_side[:num_trades]
+        rows['quantity'] = trade_quantity[:num_trades]
+        rows['price'] = trade_price[:num_trades]
+        rows['commission'] = 0.0
+        rows['timestamp'] = trade_timestamps
+        self.trade_count += num_trades
+
+        closed = np.flatnonzero(~np.isnan(trade_pnl[:num_trades]))
+        self.closed_log = _reserve(self.closed_log, self.closed_count, len(closed))
+        rows = self.closed_log[self.closed_count:self.closed_count + len(closed)]
+        rows['slot'] = slot
+        rows['pnl'] = trade_pnl[closed]
+        rows['timestamp'] = trade_timestamps[closed]
+        self.closed_count += len(closed)
 
+        self.cash = cash
+        self.quantities[slot] = quantity
+        self.avg_prices[slot] = avg_price if quantity != 0 else 0.0
+        self._update_held_columns()
@@ -1,27 +1,178 @@
+import functools
+import math
 import numpy as np
 import pandas as pd
-from typing import List, Dict, Any
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+from src.utils.jit import njit, NUMBA_AVAILABLE
+
+_NANOSECONDS_PER_DAY = 86_400_000_000_000
+
+
+@njit(cache=True)
+def _return_moments_kernel(returns: np.ndarray) -> Tuple[float, float, float]:
+    """
+    Computes the moments used by the return-based metrics in a single pass.
+
+    Uses Welford's update for the running mean and squared deviations of the returns
+    and, in the same loop, sums the squared negative returns for the downside deviation.
+
+    Args:
+        returns: The period returns, without NaNs.
+
+    Returns:
+        A tuple of (mean, std, downside_deviation). std uses ddof=1 and is NaN with fewer
+        than two values; the mean and downside deviation are NaN without returns.
+    """
+    count = 0
+    mean = 0.0
+    m2 = 0.0
+    downside_sq = 0.0
+    for r in returns:
+        count += 1
+        delta = r - mean
+        mean += delta / count
+        m2 += delta * (r - mean)
+        if r < 0:
+            downside_sq += r * r
+    if count == 0:
+        return np.nan, np.nan, np.nan
+    std = math.sqrt(m2 / (count - 1)) if count > 1 else np.nan
+    return mean, std, math.sqrt(downside_sq / count)
+
+
+def return_moments(returns: np.ndarray) -> Tuple[float, float, float]:
+    """
+    Computes the mean, standard deviation and downside deviation of returns.
+
+    The downside deviation is taken against a zero target over all periods,
+    sqrt(mean(min(r, 0) ** 2)). Uses the single-pass Numba kernel when Numba is
+    installed and NumPy reductions otherwise, which are faster than the kernel as a
+    plain Python loop.
+
+    Args:
+        returns: The period returns, without NaNs.
+
+    Returns:
+        A tuple of (mean, std, downside_deviation). std uses ddof=1 and is NaN with fewer
+        than two values; the mean and downside deviation are NaN without returns.
+    """
+    if NUMBA_AVAILABLE:
+        return _return_moments_kernel(returns)
+    if returns.size == 0:
+        return np.nan, np.nan, np.nan
+    downside = np.minimum(returns, 0.0)
+    std = returns.std(ddof=1) if returns.size > 1 else np.nan
+    return returns.mean(), std, np.sqrt(np.dot(downside, downside) / returns.size)
+
+
+def _memoized_metric(method: Callable) -> Callable:
+    """
+    Caches a metric's result on the PerformanceCalculator instance.
+
+    The metrics are pure functions of the constructor inputs, so a repeated call, e.g.
+    directly and again through generate_performance_report, returns the stored value.
+    Results are keyed by the method and its arguments.
+
+    Args:
+        method: The metric method to wrap.
+
+    Returns:
+        The memoizing wrapper.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        key = (method.__name__, args, tuple(sorted(kwargs.items())))
+        cache = self.metric_cache
+        if key not in cache:
+            cache[key] = method(self, *args, **kwargs)
+        return cache[key]
+    return wrapper
+
 
 class PerformanceCalculator:
     """
     Calculates various performance metrics for a backtesting strategy.
     """
-    def __init__(self, equity_curve: List[Dict[str, Any]], trades: List[Dict[str, Any]], closed_trades: List[Dict[str, Any]], risk_free_rate: float = 0.02):
+    def __init__(self, equity_curve: Union[List[Dict[str, Any]], pd.Series, Tuple[np.ndarray, np.ndarray]], trades: Union[List[Dict[str, Any]], np.ndarray], closed_trades: Optional[Union[List[Dict[str, Any]], np.ndarray]] = None, risk_free_rate: float = 0.02):
         """
         Initializes the PerformanceCalculator.
 
         Args:
-            equity_curve: A list of dictionaries representing the equity curve.
-            trades: A list of dictionaries representing the trades.
-            closed_trades: A list of dictionaries representing the closed trades with PnL.
+            equity_curve: A list of dictionaries representing the equity curve, a Series of
+                equity values indexed by timestamp, or a (timestamps, equity) tuple of arrays
+                such as PortfolioManager.equity_ndarray(). The latter two avoid parsing one
+                dict per bar.
+            trades: A list of dictionaries representing the trades, or a structured array
+                such as PortfolioManager.trade_array() when closed_trades is given.
+            closed_trades: A list of dictionaries representing the closed trades with PnL, or a
+                structured array with a 'pnl' field such as PortfolioManager.closed_trade_array().
+                If omitted, it is derived from the trades by matching sells against buys.
             risk_free_rate: The risk-free rate of return.
         """
-        self.equity_curve = pd.DataFrame(equity_curve).set_index("timestamp")
-        self.equity_curve.index = pd.to_datetime(self.equity_curve.index)
-        self.equity_curve["equity"] = pd.to_numeric(self.equity_curve["equity"])
+        # Timestamps are kept as int64 nanoseconds since the epoch; only cagr and
+        # calculate_returns need them, and neither needs boxed datetimes.
+        if isinstance(equity_curve, tuple):
+            timestamps, equity = equity_curve
+            self.timestamps: np.ndarray = np.asarray(timestamps, dtype="datetime64[ns]").view(np.int64)
+        elif isinstance(equity_curve, pd.Series):
+            equity = equity_curve.to_numpy(dtype=np.float64)
+            self.timestamps = pd.DatetimeIndex(equity_curve.index).as_unit("ns").asi8
+        else:
+            equity = np.fromiter((point["equity"] for point in equity_curve), dtype=np.float64, count=len(equity_curve))
+            self.timestamps = pd.to_datetime([point["timestamp"] for point in equity_curve]).as_unit("ns").asi8
         self.trades = trades
-        self.closed_trades = closed_trades
+        self.closed_trades = closed_trades if closed_trades is not None else self.pair_trades(trades)
         self.risk_free_rate = risk_free_rate
+        if isinstance(self.closed_trades, np.ndarray):
+            self.closed_pnls: np.ndarray = self.closed_trades['pnl']
+        else:
+            self.closed_pnls = np.fromiter((trade['pnl'] for trade in self.closed_trades), dtype=np.float64,
+                                           count=len(self.closed_trades))
+
+        # Compute equity and returns as NumPy arrays once; every metric below reads from these.
+        self.equity: np.ndarray = np.asarray(equity, dtype=np.float64)
+        self.returns_series: Optional[pd.Series] = None
+        self.metric_cache: Dict[Tuple, Any] = {}
+        with np.errstate(divide="ignore", invalid="ignore"):
+            returns = np.diff(self.equity) / self.equity[:-1]
+        self.returns: np.ndarray = returns[~np.isnan(returns)]
+        # Sharpe, Sortino and volatility all read these, computed in one sweep over the returns
+        self.mean_return: float
+        self.std_return: float
+        self.downside_deviation: float
+        self.mean_return, self.std_return, self.downside_deviation = return_moments(self.returns)
+
+    @staticmethod
+    def pair_trades(trades: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Derives closed trades from a trade log in a single pass.
+
+        Each sell is matched against the average price of the buys held in the same
+        symbol, mirroring how PortfolioManager books PnL for long positions.
+
+        Args:
+            trades: A list of dictionaries representing the trades.
+
+        Returns:
+            A list of dictionaries with the 'symbol', 'pnl' and 'timestamp' of each closing sell.
+        """
+        closed_trades: List[Dict[str, Any]] = []
+        holdings: Dict[Any, List[float]] = {}  # symbol -> [quantity, avg_price]
+        for trade in trades:
+            symbol = trade.get('symbol')
+            quantity = trade['quantity']
+            price = trade['price']
+            held = holdings.setdefault(symbol, [0.0, 0.0])
+            if trade['type'] == 'buy':
+                total_quantity = held[0] + quantity
+                held[1] = (held[0] * held[1] + quantity * price) / total_quantity if total_quantity > 0 else 0.0
+                held[0] = total_quantity
+            elif held[0] > 0:
+                closed_quantity = min(quantity, held[0])
+                pnl = (price - held[1]) * closed_quantity - trade.get('commission', 0.0)
+                closed_trades.append({'symbol': symbol, 'pnl': pnl, 'timestamp': trade.get('timestamp')})
+                held[0] -= closed_quantity
+        return closed_trades
 
     def calculate_returns(self) -> pd.Series:
         """
@@ -30,9 +181,19 @@ class PerformanceCalculator:
         Returns:
             A pandas Series representing the daily returns.
         """
-        self.equity_curve["returns"] = self.equity_curve["equity"].pct_change()
-        return self.equity_curve["returns"]
+        # Built once from the equity array on first use; the metrics themselves read the
+        # cached self.returns array.
+        if self.returns_series is None:
+            returns = np.empty_like(self.equity)
+            returns[:1] = np.nan
+            with np.errstate(divide="ignore", invalid="ignore"):
+                np.divide(self.equity[1:], self.equity[:-1], out=returns[1:])
+            returns[1:] -= 1.0
+            index = pd.DatetimeIndex(self.timestamps.view("datetime64[ns]"), name="timestamp")
+            self.returns_series = pd.Series(returns, index=index, name="returns")
+        return self.returns_series
 
+    @_memoized_metric
     def sharpe_ratio(self) -> float:
         """
         Calculates the Sharpe Ratio.
@@ -41,35 +202,35 @@ class PerformanceCalculator:
         Returns:
             The Sharpe Ratio.
         """
-        returns = self.calculate_returns().dropna()
-        if returns.empty:
+        if self.returns.size == 0:
             return 0.0
-        annualized_returns = returns.mean() * 252
-        annualized_std = returns.std() * np.sqrt(252)
+        annualized_returns = self.mean_return * 252
+        annualized_std = self.std_return * np.sqrt(252)
         if annualized_std == 0:
             return 0.0
         return (annualized_returns - self.risk_free_rate) / annualized_std
 
+    @_memoized_metric
     def sortino_ratio(self) -> float:
         """
         Calculates the Sortino Ratio.
         (Mean Return - Risk-Free Rate) / Downside Deviation
 
+        The downside deviation is the root mean square of the returns below a zero
+        target, taken over all periods (periods above the target count as zero).
+
         Returns:
-            The Sortino Ratio.
+            The Sortino Ratio, or 0.0 if there are no returns below the target.
         """
-        returns = self.calculate_returns().dropna()
-        if returns.empty:
+        if self.returns.size == 0:
             return 0.0
-        downside_returns = returns[returns < 0]
-        if downside_returns.empty:
-            return np.inf
-        downside_std = downside_returns.std() * np.sqrt(252)
-        annualized_returns = returns.mean() * 252
-        if downside_std == 0 or np.isnan(downside_std):
+        downside_deviation = self.downside_deviation * np.sqrt(252)
+        if downside_deviation == 0:
             return 0.0
-        return (annualized_returns - self.risk_free_rate) / downside_std
+        annualized_returns = self.mean_return * 252
+        return (annualized_returns - self.risk_free_rate) / downside_deviation
 
+    @_memoized_metric
     def max_drawdown(self) -> float:
         """
         Calculates the Maximum Drawdown.
@@ -77,13 +238,16 @@ class PerformanceCalculator:
         Returns:
             The Maximum Drawdown.
         """
-        if self.equity_curve.empty:
+        if self.equity.size == 0:
             return 0.0
-        equity = self.equity_curve["equity"]
-        peak = equity.expanding(min_periods=1).max()
-        drawdown = (equity - peak) / peak
-        return drawdown.min()
+        # Running peak in one C-level scan; the division is done in place so no
+        # further temporary is allocated.
+        peak = np.fmax.accumulate(self.equity)
+        drawdown = self.equity - peak
+        drawdown /= peak
+        return np.nanmin(drawdown)
 
+    @_memoized_metric
     def win_loss_ratio(self) -> float:
         """
         Calculates the Win/Loss Ratio based on closed trade PnL.
@@ -91,16 +255,17 @@ class PerformanceCalculator:
         Returns:
             The Win/Loss Ratio.
         """
-        if not self.closed_trades:
+        if self.closed_pnls.size == 0:
             return 0.0
 
-        wins = sum(1 for trade in self.closed_trades if trade['pnl'] > 0)
-        losses = sum(1 for trade in self.closed_trades if trade['pnl'] <= 0)
+        wins = np.count_nonzero(self.closed_pnls > 0)
+        losses = np.count_nonzero(self.closed_pnls < 0)
 
         if losses == 0:
             return float("inf") if wins > 0 else 0.0
-        return wins / losses
+        return float(wins / losses)
 
+    @_memoized_metric
     def cagr(self) -> float:
         """
         Calculates the Compound Annual Growth Rate (CAGR).
@@ -108,15 +273,16 @@ class PerformanceCalculator:
         Returns:
             The CAGR.
         """
-        if self.equity_curve.empty:
+        if self.equity.size == 0:
             return 0.0
-        start_equity = self.equity_curve["equity"].iloc[0]
-        end_equity = self.equity_curve["equity"].iloc[-1]
+        start_equity = self.equity[0]
+        end_equity = self.equity[-1]
         
         if start_equity <= 0:
             return 0.0 # Avoid division by zero or negative base
 
-        num_years = (self.equity_curve.index[-1] - self.equity_curve.index[0]).days / 365.0
+        # Whole days between the first and last timestamp, straight from the int64 nanoseconds
+        num_years = ((self.timestamps[-1] - self.timestamps[0]) // _NANOSECONDS_PER_DAY) / 365.0
         if num_years <= 0:
             return 0.0
         
@@ -126,6 +292,7 @@ class PerformanceCalculator:
         else:
             return (end_equity / start_equity)**(1 / num_years) - 1
 
+    @_memoized_metric
     def volatility(self) -> float:
         """
         Calculates the annualized volatility of returns.
@@ -133,11 +300,11 @@ class PerformanceCalculator:
         Returns:
             The annualized volatility.
         """
-        returns = self.calculate_returns().dropna()
-        if returns.empty:
+        if self.returns.size == 0:
             return 0.0
-        return returns.std() * np.sqrt(252)
+        return self.std_return * np.sqrt(252)
 
+    @_memoized_metric
     def value_at_risk(self, confidence_level: float = 0.99) -> float:
         """
         Calculates the Historical Value at Risk (VaR).
@@ -148,19 +315,15 @@ class PerformanceCalculator:
         Returns:
             The VaR value.
         """
-        returns = self.calculate_returns().dropna()
-        if returns.empty:
+        if self.returns.size == 0:
             return 0.0
         
-        # Sort returns in ascending order
-        sorted_returns = returns.sort_values(ascending=True)
-        
-        # Calculate the index for the VaR
-        var_index = int(len(sorted_returns) * (1 - confidence_level))
-        
-        # VaR is the return at this index
-        var = abs(sorted_returns.iloc[var_index])
-        
+        # Calculate the index for the VaR in the ascending order of returns
+        var_index = int(len(self.returns) * (1 - confidence_level))
+
+        # Only the return at this index is needed, so partition (O(N)) instead of sorting
+        var = abs(np.partition(self.returns, var_index)[var_index])
+
         return var
 
     def generate_performance_report(self) -> Dict[str, Any]:
@@ -178,8 +341,8 @@ class PerformanceCalculator:
             "CAGR": self.cagr(),
             "Volatility": self.volatility(),
             "Value at Risk (99%)": self.value_at_risk(0.99),
-            "Initial Cash": self.equity_curve["equity"].iloc[0] if not self.equity_curve.empty else 0.0,
-            "Final Equity": self.equity_curve["equity"].iloc[-1] if not self.equity_curve.empty else 0.0,
+            "Initial Cash": self.equity[0] if self.equity.size else 0.0,
+            "Final Equity": self.equity[-1] if self.equity.size else 0.0,
             "Total Trades": len(self.trades)
         }
         return report
@@ -0,0 +1,141 @@
+import numpy as np
+from src.utils.jit import njit
+
+
+@njit(cache=True)
+def apply_trade(is_buy: bool, quantity: float, price: float, commission: float, cash: float,
+                current_quantity: float, current_avg_price: float):
+    """
+    Applies a single trade to the cash balance and a position, using scalars only.
+
+    This is the accounting behind PortfolioManager.execute_trade. It is compiled with
+    Numba when available and is also called from simulate_signals, so both backtest
+    paths book trades identically.
+
+    Buys and sells are netted as a signed quantity change: cash always moves by the
+    traded notional plus commission, and a trade against the current position realizes
+    PnL on the part of the position it closes. Whatever is left over after crossing
+    zero opens a new position at the trade price.
+
+    Args:
+        is_buy: True for a buy, False for a sell.
+        quantity: The traded quantity.
+        price: The execution price.
+        commission: The commission of the trade.
+        cash: The cash balance before the trade.
+        current_quantity: The position quantity before the trade (negative when short).
+        current_avg_price: The average entry price of the position.
+
+    Returns:
+        A tuple of (executed, cash, quantity, avg_price, realized_pnl). executed is False
+        if a buy could not be afforded, in which case nothing changes. realized_pnl is the
+        PnL net of commission if the trade reduced or closed a position, NaN otherwise.
+    """
+    signed_quantity = quantity if is_buy else -quantity
+    cost = signed_quantity * price + commission
+    if is_buy and cash < cost:
+        return False, cash, current_quantity, current_avg_price, np.nan
+
+    new_quantity = current_quantity + signed_quantity
+    realized_pnl = np.nan
+    if current_quantity * signed_quantity < 0:
+        # Trading against the position: realize PnL on the closed part. The average price
+        # is kept while the position only shrinks and reset when it flips.
+        closed_quantity = min(abs(current_quantity), quantity)
+        direction = 1.0 if current_quantity > 0 else -1.0
+        realized_pnl = (price - current_avg_price) * closed_quantity * direction - commission
+        new_avg_price = current_avg_price if current_quantity * new_quantity > 0 else price
+    elif new_quantity != 0:
+        # Opening or adding to a position: volume-weighted average entry price
+        new_avg_price = (current_quantity * current_avg_price + signed_quantity * price) / new_quantity
+    else:
+        new_avg_price = 0.0
+
+    # A flat position has no average price
+    if new_quantity == 0:
+        new_avg_price = 0.0
+    return True, cash - cost, new_quantity, new_avg_price, realized_pnl
+
+
+@njit(cache=True)
+def simulate_signals(close: np.ndarray, buy_signal: np.ndarray, sell_signal: np.ndarray,
+                     initial_cash: float, stop_loss_percentage: float):
+    """
+    Runs a full long-only backtest over a single price series in one pass.
+
+    Mirrors the bar-by-bar path of the single-symbol strategies (portfolio update,
+    stop-loss check, then signal handling) with scalar state so it can be JIT-compiled
+    by Numba. On a buy signal all available cash is invested if no position was entered
+    yet; on a sell signal an open position is closed.
+
+    Args:
+        close: Close prices of the traded symbol.
+        buy_signal: Boolean array, True on bars where the strategy's buy condition holds.
+        sell_signal: Boolean array, True on bars where the strategy's sell condition holds.
+        initial_cash: The starting cash of the portfolio.
+        stop_loss_percentage: The stop-loss percentage (0 disables the stop-loss).
+
+    Returns:
+        A tuple of (equity, trade_index, trade_side, trade_quantity, trade_price,
+        trade_pnl, num_trades, cash, quantity, avg_price). Sides are 1 for buys and
+        -1 for sells; trade_pnl is NaN for trades that do not close a position.
+    """
+    n = close.shape[0]
+    equity = np.empty(n)
+    trade_index = np.empty(n, dtype=np.int64)
+    trade_side = np.empty(n, dtype=np.int8)
+    trade_quantity = np.empty(n)
+    trade_price = np.empty(n)
+    trade_pnl = np.empty(n)
+    num_trades = 0
+
+    cash = initial_cash
+    quantity = 0.0
+    avg_price = 0.0
+    entry_price = 0.0
+    in_position = False
+
+    for i in range(n):
+        price = close[i]
+        equity[i] = cash + quantity * price if quantity != 0.0 else cash
+
+        # Each branch books its trade through apply_trade, like PortfolioManager.execute_trade
+        if quantity > 0 and stop_loss_percentage > 0 and price <= entry_price * (1 - stop_loss_percentage):
+            sell_quantity = quantity
+            _, cash, quantity, avg_price, pnl = apply_trade(False, sell_quantity, price, 0.0, cash, quantity, avg_price)
+            trade_index[num_trades] = i
+            trade_side[num_trades] = -1
+            trade_quantity[num_trades] = sell_quantity
+            trade_price[num_trades] = price
+            trade_pnl[num_trades] = pnl
+            num_trades += 1
+            entry_price = 0.0
+
+        if buy_signal[i] and not in_position:
+            quantity_to_buy = float(int(cash / price))
+            if quantity_to_buy > 0:
+                executed, cash, quantity, avg_price, pnl = apply_trade(True, quantity_to_buy, price, 0.0, cash, quantity, avg_price)
+                if executed:
+                    entry_price = price
+                    trade_index[num_trades] = i
+                    trade_side[num_trades] = 1
+                    trade_quantity[num_trades] = quantity_to_buy
+                    trade_price[num_trades] = price
+                    trade_pnl[num_trades] = pnl
+                    num_trades += 1
+                in_position = True
+        elif sell_signal[i] and in_position:
+            if quantity > 0:
+                sell_quantity = quantity
+                _, cash, quantity, avg_price, pnl = apply_trade(False, sell_quantity, price, 0.0, cash, quantity, avg_price)
+                trade_index[num_trades] = i
+                trade_side[num_trades] = -1
+                trade_quantity[num_trades] = sell_quantity
+                trade_price[num_trades] = price
+                trade_pnl[num_trades] = pnl
+                num_trades += 1
+                entry_price = 0.0
+                in_position = False
+
+    return (equity, trade_index, trade_side, trade_quantity, trade_price, trade_pnl,
+            num_trades, cash, quantity, avg_price)
@@ -1,10 +1,23 @@
+import logging
+import numpy as np
 import pandas as pd
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple
+from src.strategies._signal_kernel import simulate_signals
+
+logger = logging.getLogger(__name__)
 
 class Strategy:
     """
     Base class for all trading strategies.
     """
+    # Strategies that can simulate a whole backtest in one compiled pass set this to True
+    # and precompute boolean buy_signal and sell_signal arrays in set_data.
+    vectorized: bool = False
+    # Subclasses declare their own attributes in __slots__ as well, so instances carry
+    # no per-instance __dict__ (many are created during parameter sweeps).
+    __slots__ = ('symbol', 'portfolio_manager', 'data', 'timestamps', 'close', 'current_index',
+                 'stop_loss_percentage')
+
     def __init__(self, symbol: str, stop_loss_percentage: float = 0.0):
         """
         Initializes the base strategy.
@@ -16,10 +29,10 @@ class Strategy:
         self.symbol: str = symbol
         self.portfolio_manager: Optional[Any] = None
         self.data: Optional[pd.DataFrame] = None
+        self.timestamps: Optional[np.ndarray] = None
+        self.close: Optional[np.ndarray] = None
         self.current_index: int = -1
         self.stop_loss_percentage: float = stop_loss_percentage
-        self.entry_price: float = 0.0
-        self.position_quantity: float = 0.0
 
     def initialize(self, portfolio_manager: Any):
         """
@@ -34,24 +47,136 @@ class Strategy:
         """
         Sets the historical data for the strategy.
 
+        Subclasses may override this to precompute indicator arrays once over the full
+        history so that on_bar only has to index them. Such indicators must be causal:
+        the value at bar i may only depend on data up to and including bar i (trailing
+        rolling windows satisfy this).
+
         Args:
             data: A pandas DataFrame containing historical market data.
         """
         self.data = data
+        # Trades are stamped from this array; indexing a DatetimeIndex boxes a Timestamp each time.
+        self.timestamps = data.index.to_numpy()
+        # The strategy symbol's close prices, so bar handlers index an array instead of a row
+        column = f"Close_{self.symbol}"
+        self.close = data[column].to_numpy(dtype=np.float64) if column in data.columns else None
 
     def on_bar(self, index: int, row: pd.Series):
         """
         This method is called for each bar (time period) of data.
-        Subclasses should implement their trading logic here.
+
+        Subclasses implement their trading logic in either on_bar or on_bar_fast. The
+        default implementation forwards to on_bar_fast with the close price and
+        timestamp read from the cached arrays, so the row is only read if the
+        strategy's symbol has no close column, in which case a KeyError is raised.
 
         Args:
             index: The integer index of the current row in the full data.
             row: A pandas Series representing the current bar's data.
         """
         self.current_index = index
-        raise NotImplementedError("on_bar method must be implemented by subclasses")
+        if type(self).on_bar_fast is Strategy.on_bar_fast:
+            raise NotImplementedError("on_bar or on_bar_fast must be implemented by subclasses")
+        if self.close is None:
+            raise KeyError(f"Close_{self.symbol}")
+        self.on_bar_fast(index, self.close[index], self.timestamps[index])
+
+    def on_bar_fast(self, index: int, close: float, timestamp: Any):
+        """
+        Fast-path variant of on_bar that receives plain scalars instead of a row.
+
+        The backtesting engine calls this method for every bar. Subclasses should
+        override it to avoid boxing each bar into a pandas Series; the default
+        implementation falls back to on_bar with the full row, for strategies that
+        only implement on_bar.
+
+        Args:
+            index: The integer index of the current row in the full data.
+            close: The close price of the strategy's symbol for the current bar.
+            timestamp: The timestamp of the current bar.
+        """
+        if self.data is None:
+            raise RuntimeError("Data not set for strategy.")
+        self.on_bar(index, self.data.iloc[index])
+
+    def active_bars(self) -> Optional[np.ndarray]:
+        """
+        Returns the indices of the bars on which on_bar_fast may trade.
+
+        Strategies whose signals can be precomputed as boolean masks override this so
+        the engine can skip bars with no possible action. Stop-loss bars are handled
+        separately through next_stop_loss_bar.
+
+        Returns:
+            A sorted integer array of bar indices, or None if every bar must be visited.
+        """
+        return None
+
+    def next_stop_loss_bar(self, close: np.ndarray, start: int) -> int:
+        """
+        Finds the first bar at or after `start` on which check_stop_loss would trigger.
 
-    def buy(self, quantity: float, price: float, commission: float = 0.0):
+        Assumes the position does not change before that bar.
+
+        Args:
+            close: The close prices of the strategy's symbol.
+            start: The index of the first bar to search.
+
+        Returns:
+            The index of the triggering bar, or len(close) if the stop-loss is not hit.
+        """
+        if self.stop_loss_percentage > 0 and self.portfolio_manager is not None:
+            quantity, avg_price = self.portfolio_manager.position_of(self.symbol)
+            if quantity <= 0:
+                return len(close)
+            stop_loss_price = avg_price * (1 - self.stop_loss_percentage)
+            hits = np.flatnonzero(close[start:] <= stop_loss_price)
+            if hits.size:
+                return start + int(hits[0])
+        return len(close)
+
+    def run_vectorized(self, initial_cash: float) -> Tuple:
+        """
+        Runs the whole backtest in a single compiled pass over the close prices.
+
+        Only available on strategies with `vectorized = True`, driven by their
+        buy_signal and sell_signal arrays. See PortfolioManager.record_simulation for
+        the expected result layout.
+
+        Args:
+            initial_cash: The starting cash of the portfolio.
+
+        Returns:
+            A tuple of (equity, trade_index, trade_side, trade_quantity, trade_price,
+            trade_pnl, num_trades, cash, quantity, avg_price).
+        """
+        if not self.vectorized:
+            raise NotImplementedError("run_vectorized is only available on vectorized strategies")
+        if self.data is None:
+            raise RuntimeError("Data not set for strategy.")
+        return simulate_signals(self.close, self.buy_signal, self.sell_signal,
+                                float(initial_cash), float(self.stop_loss_percentage))
+
+    def max_quantity(self, price: float, fraction: float = 1.0) -> int:
+        """
+        Returns the number of whole units that a fraction of the available cash buys.
+
+        Only meant to be called once a signal has fired, so bars without a signal never
+        pay for the cash lookup and division.
+
+        Args:
+            price: The price per unit.
+            fraction: The fraction of the available cash to spend (default is all of it).
+
+        Returns:
+            The largest affordable whole quantity.
+        """
+        if self.portfolio_manager is None:
+            raise RuntimeError("PortfolioManager not set for strategy.")
+        return int(self.portfolio_manager.cash * fraction / price)
+
+    def buy(self, quantity: float, price: float, commission: float = 0.0, symbol: Optional[str] = None):
         """
         Executes a buy order.
 
@@ -59,23 +184,22 @@ class Strategy:
             quantity: The quantity to buy.
             price: The price at which to buy.
             commission: The commission for the trade (default is 0).
+            symbol: The symbol to trade; defaults to the strategy's symbol.
         """
         if self.data is None or self.portfolio_manager is None:
             raise RuntimeError("Data or PortfolioManager not set for strategy.")
 
         trade: Dict[str, Any] = {
-            'symbol': self.symbol,
+            'symbol': self.symbol if symbol is None else symbol,
             'type': 'buy',
             'quantity': quantity,
             'price': price,
             'commission': commission,
-            'timestamp': self.data.index[self.current_index]
+            'timestamp': self.timestamps[self.current_index]
         }
-        if self.portfolio_manager.execute_trade(trade):
-            self.entry_price = price
-            self.position_quantity = quantity
+        self.portfolio_manager.execute_trade(trade)
 
-    def sell(self, quantity: float, price: float, commission: float = 0.0):
+    def sell(self, quantity: float, price: float, commission: float = 0.0, symbol: Optional[str] = None):
         """
         Executes a sell order.
 
@@ -83,34 +207,37 @@ class Strategy:
             quantity: The quantity to sell.
             price: The price at which to sell.
             commission: The commission for the trade (default is 0).
+            symbol: The symbol to trade; defaults to the strategy's symbol.
         """
         if self.data is None or self.portfolio_manager is None:
             raise RuntimeError("Data or PortfolioManager not set for strategy.")
 
         trade: Dict[str, Any] = {
-            'symbol': self.symbol,
+            'symbol': self.symbol if symbol is None else symbol,
             'type': 'sell',
             'quantity': quantity,
             'price': price,
             'commission': commission,
-            'timestamp': self.data.index[self.current_index]
+            'timestamp': self.timestamps[self.current_index]
         }
-        if self.portfolio_manager.execute_trade(trade):
-            self.entry_price = 0.0
-            self.position_quantity = 0.0
+        self.portfolio_manager.execute_trade(trade)
 
     def check_stop_loss(self, current_price: float):
         """
         Checks if a stop-loss condition is met and executes a sell order if it is.
         This method assumes a long position.
 
+        The position is read from the portfolio manager, so the stop is placed relative
+        to its average entry price.
+
         Args:
             current_price: The current market price of the asset.
         """
-        if self.position_quantity > 0 and self.stop_loss_percentage > 0:
-            stop_loss_price = self.entry_price * (1 - self.stop_loss_percentage)
-            if current_price <= stop_loss_price:
-                self.sell(self.position_quantity, current_price)
-                print(f"STOP LOSS triggered for {self.symbol} at {current_price:.2f}")
+        if self.stop_loss_percentage > 0 and self.portfolio_manager is not None:
+            quantity, avg_price = self.portfolio_manager.position_of(self.symbol)
+            if quantity > 0 and current_price <= avg_price * (1 - self.stop_loss_percentage):
+                self.sell(quantity, current_price)
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("STOP LOSS triggered for %s at %.2f", self.symbol, current_price)
 
 
@@ -2,7 +2,10 @@ from src.strategies.base_strategy import Strategy
 import pandas as pd
 import numpy as np
 import logging
-import random
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
 
 class LSTMStrategy(Strategy):
     """
@@ -11,42 +14,52 @@ class LSTMStrategy(Strategy):
     and prediction logic needs to be properly implemented for real-world use,
     likely involving offline training and more sophisticated prediction methods.
     """
-    def __init__(self, symbol: str, look_back: int = 60, epochs: int = 10, batch_size: int = 32, train_split: float = 0.8, stop_loss_percentage: float = 0.0):
+    __slots__ = ('look_back', 'epochs', 'batch_size', 'train_split', 'seed', 'noise', 'in_position')
+
+    def __init__(self, symbol: str, look_back: int = 60, epochs: int = 10, batch_size: int = 32, train_split: float = 0.8, stop_loss_percentage: float = 0.0, seed: Optional[int] = 42):
         super().__init__(symbol, stop_loss_percentage=stop_loss_percentage)
         self.look_back = look_back
         self.epochs = epochs
         self.batch_size = batch_size
         self.train_split = train_split
+        self.seed = seed # Seed of the simulated predictions; None draws a fresh sequence every run
+        self.noise: Optional[np.ndarray] = None
         self.in_position: bool = False # Initialize in_position
-        logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-    def on_bar(self, index: int, row: pd.Series):
+    def set_data(self, data: pd.DataFrame):
+        super().set_data(data)
+        # Draw the simulated prediction noise for every bar in one vectorized call
+        self.noise = np.random.default_rng(self.seed).uniform(-0.01, 0.01, size=len(data))
+
+    def on_bar_fast(self, index: int, close: float, timestamp: Any):
         self.current_index = index
 
         if self.data is None:
             raise RuntimeError("Data not set for strategy.")
 
-        current_price = row[f"Close_{self.symbol}"]
+        current_price = close
 
         # Placeholder for LSTM prediction
         # In a real scenario, you would use your trained LSTM model here
         # For now, we'll simulate a prediction based on a random chance
-        predicted_price = current_price * (1 + (random.random() - 0.5) * 0.02) # Random +/- 1% change
+        predicted_price = current_price * (1 + self.noise[index]) # Random +/- 1% change
 
         # Simple trading logic: buy if predicted price is significantly higher, sell if significantly lower
         if predicted_price > current_price * 1.005 and not self.in_position: # Predicts 0.5% increase
-            if self.portfolio_manager is None:
-                raise RuntimeError("PortfolioManager not set for strategy.")
-            quantity_to_buy = int(self.portfolio_manager.cash / current_price)
+            quantity_to_buy = self.max_quantity(current_price)
             if quantity_to_buy > 0:
                 self.buy(quantity_to_buy, current_price)
                 self.in_position = True
-                logging.info(f"{row.name}: BUY {quantity_to_buy} of {self.symbol} at {current_price:.2f} (Simulated Predicted: {predicted_price:.2f})")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("%s: BUY %s of %s at %.2f (Simulated Predicted: %.2f)", timestamp, quantity_to_buy, self.symbol,
+                                 current_price, predicted_price)
         elif predicted_price < current_price * 0.995 and self.in_position: # Predicts 0.5% decrease
             if self.portfolio_manager is None:
                 raise RuntimeError("PortfolioManager not set for strategy.")
-            quantity_to_sell = self.portfolio_manager.positions.get(self.symbol, {}).get("quantity", 0)
+            quantity_to_sell, _ = self.portfolio_manager.position_of(self.symbol)
             if quantity_to_sell > 0:
                 self.sell(quantity_to_sell, current_price)
                 self.in_position = False
-                logging.info(f"{row.name}: SELL {quantity_to_sell} of {self.symbol} at {current_price:.2f} (Simulated Predicted: {predicted_price:.2f})")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("%s: SELL %s of %s at %.2f (Simulated Predicted: %.2f)", timestamp, quantity_to_sell, self.symbol,
+                                 current_price, predicted_price)
@@ -1,7 +1,12 @@
 from src.strategies.base_strategy import Strategy
+import logging
 import pandas as pd
 import numpy as np
-from typing import Any
+from typing import Any, Optional, Tuple
+from src.utils.rolling import rolling_mean, rolling_std
+
+logger = logging.getLogger(__name__)
+
 
 class MeanReversion(Strategy):
     """
@@ -10,6 +15,10 @@ class MeanReversion(Strategy):
     Buys when price is significantly below a moving average.
     Sells when price is significantly above a moving average.
     """
+    vectorized: bool = True
+    __slots__ = ('window', 'num_std_dev', 'upper_band', 'lower_band', 'buy_signal', 'sell_signal',
+                 'signal_bars', 'in_position')
+
     def __init__(self, symbol: str, window: int = 20, num_std_dev: float = 2.0, stop_loss_percentage: float = 0.0):
         """
         Initializes the MeanReversion strategy.
@@ -24,14 +33,64 @@ class MeanReversion(Strategy):
         self.window: int = window
         self.num_std_dev: float = num_std_dev
         self.in_position: bool = False
+        self.upper_band: Optional[np.ndarray] = None
+        self.lower_band: Optional[np.ndarray] = None
+        self.buy_signal: Optional[np.ndarray] = None
+        self.sell_signal: Optional[np.ndarray] = None
+        self.signal_bars: Optional[np.ndarray] = None
+
+    def set_data(self, data: pd.DataFrame):
+        """
+        Sets the historical data and precomputes the Bollinger bands in a single pass.
+
+        Args:
+            data: A pandas DataFrame containing historical market data.
+        """
+        super().set_data(data)
+        self.upper_band, self.lower_band = self._calculate_bands(self.close)
+        # NaN warm-up bands compare False, so those bars never become active.
+        self.buy_signal = self.close < self.lower_band
+        self.sell_signal = self.close > self.upper_band
+        self.signal_bars = np.flatnonzero(self.buy_signal | self.sell_signal)
+
+    def active_bars(self) -> Optional[np.ndarray]:
+        """
+        Returns the bars on which the price is outside the bands.
+
+        On every other bar neither the buy nor the sell branch of on_bar_fast can fire.
+
+        Returns:
+            A sorted integer array of bar indices.
+        """
+        return self.signal_bars
+
+    def _calculate_bands(self, close: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Calculates the upper and lower bands over the full price history.
+
+        The rolling windows are trailing, so the value at each index only depends on
+        prices up to and including that bar.
+
+        Args:
+            close: The close prices.
 
-    def on_bar(self, index: int, row: pd.Series):
+        Returns:
+            A tuple of (upper_band, lower_band) arrays aligned with the input prices.
         """
-        Executes the mean reversion trading logic for each bar.
+        mean = rolling_mean(close, self.window)
+        std = rolling_std(close, self.window)
+        upper_band = mean + (std * self.num_std_dev)
+        lower_band = mean - (std * self.num_std_dev)
+        return upper_band, lower_band
+
+    def on_bar_fast(self, index: int, close: float, timestamp: Any):
+        """
+        Executes the mean reversion trading logic for each bar using scalar inputs.
 
         Args:
             index: The current index of the data.
-            row: The current row of market data.
+            close: The current close price of the symbol.
+            timestamp: The timestamp of the current bar.
         """
         self.current_index = index
 
@@ -41,33 +100,28 @@ class MeanReversion(Strategy):
         if index < self.window - 1:
             return
 
-        historical_data = self.data.iloc[:index+1]
-
-        rolling_mean = historical_data[f"Close_{self.symbol}"].rolling(window=self.window).mean().iloc[-1]
-        rolling_std = historical_data[f"Close_{self.symbol}"].rolling(window=self.window).std().iloc[-1]
+        upper_band = self.upper_band[index]
+        lower_band = self.lower_band[index]
 
-        upper_band = rolling_mean + (rolling_std * self.num_std_dev)
-        lower_band = rolling_mean - (rolling_std * self.num_std_dev)
-
-        current_price = row[f"Close_{self.symbol}"]
+        current_price = close
 
         if current_price < lower_band and not self.in_position:
             # Buy signal
-            if self.portfolio_manager is None:
-                raise RuntimeError("PortfolioManager not set for strategy.")
-            quantity_to_buy = int(self.portfolio_manager.cash / current_price)
+            quantity_to_buy = self.max_quantity(current_price)
             if quantity_to_buy > 0:
                 self.buy(quantity_to_buy, current_price)
                 self.in_position = True
-                print(f"{row.name}: BUY {quantity_to_buy} of {self.symbol} at {current_price}")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("%s: BUY %s of %s at %s", timestamp, quantity_to_buy, self.symbol, current_price)
         elif current_price > upper_band and self.in_position:
             # Sell signal
             if self.portfolio_manager is None:
                 raise RuntimeError("PortfolioManager not set for strategy.")
-            quantity_to_sell = self.portfolio_manager.positions.get(self.symbol, {}).get("quantity", 0)
+            quantity_to_sell, _ = self.portfolio_manager.position_of(self.symbol)
             if quantity_to_sell > 0:
                 self.sell(quantity_to_sell, current_price)
                 self.in_position = False
-                print(f"{row.name}: SELL {quantity_to_sell} of {self.symbol} at {current_price}")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("%s: SELL %s of %s at %s", timestamp, quantity_to_sell, self.symbol, current_price)
 
 
@@ -1,7 +1,12 @@
 from src.strategies.base_strategy import Strategy
+import logging
 import pandas as pd
-from collections import deque
-from typing import Any
+import numpy as np
+from typing import Any, Optional, Tuple
+from src.utils.rolling import rolling_mean
+
+logger = logging.getLogger(__name__)
+
 
 class MovingAverageCrossover(Strategy):
     """
@@ -9,6 +14,10 @@ class MovingAverageCrossover(Strategy):
     Buys when the short moving average crosses above the long moving average.
     Sells when the short moving average crosses below the long moving average.
     """
+    vectorized: bool = True
+    __slots__ = ('short_window', 'long_window', 'short_ma', 'long_ma', 'buy_signal', 'sell_signal',
+                 'in_position')
+
     def __init__(self, symbol: str, short_window: int = 50, long_window: int = 200, stop_loss_percentage: float = 0.0):
         """
         Initializes the MovingAverageCrossover strategy.
@@ -22,49 +31,77 @@ class MovingAverageCrossover(Strategy):
         super().__init__(symbol, stop_loss_percentage=stop_loss_percentage)
         self.short_window: int = short_window
         self.long_window: int = long_window
-        self.close_prices: deque = deque(maxlen=long_window)
+        self.short_ma: Optional[np.ndarray] = None
+        self.long_ma: Optional[np.ndarray] = None
         self.in_position: bool = False
+        self.buy_signal: Optional[np.ndarray] = None
+        self.sell_signal: Optional[np.ndarray] = None
 
-    def on_bar(self, index: int, row: pd.Series):
+    def set_data(self, data: pd.DataFrame):
         """
-        Executes the moving average crossover trading logic for each bar.
+        Sets the historical data and precomputes both moving averages in a single pass.
+
+        Args:
+            data: A pandas DataFrame containing historical market data.
+        """
+        super().set_data(data)
+        self.short_ma, self.long_ma = self._calculate_moving_averages(self.close)
+        # NaN warm-up averages compare False, so no signal fires before both are defined.
+        self.buy_signal = self.short_ma > self.long_ma
+        self.sell_signal = self.short_ma < self.long_ma
+
+    def _calculate_moving_averages(self, close: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Calculates the short and long trailing moving averages over the full price history.
+
+        Args:
+            close: The close prices.
+
+        Returns:
+            A tuple of (short_ma, long_ma) arrays aligned with the input prices.
+        """
+        short_ma = rolling_mean(close, self.short_window)
+        long_ma = rolling_mean(close, self.long_window)
+        return short_ma, long_ma
+
+    def on_bar_fast(self, index: int, close: float, timestamp: Any):
+        """
+        Executes the moving average crossover trading logic for each bar using scalar inputs.
 
         Args:
             index: The current index of the data.
-            row: The current row of market data.
+            close: The current close price of the symbol.
+            timestamp: The timestamp of the current bar.
         """
         self.current_index = index
-        current_price = row[f"Close_{self.symbol}"]
-        self.close_prices.append(current_price)
+        current_price = close
 
         if self.data is None:
             raise RuntimeError("Data not set for strategy.")
 
-        if len(self.close_prices) < self.long_window:
+        if index < self.long_window - 1:
             return
 
-        prices_series = pd.Series(list(self.close_prices))
-
-        short_ma = prices_series.rolling(window=self.short_window).mean().iloc[-1]
-        long_ma = prices_series.rolling(window=self.long_window).mean().iloc[-1]
+        short_ma = self.short_ma[index]
+        long_ma = self.long_ma[index]
 
         if short_ma > long_ma and not self.in_position:
             # Buy signal
-            if self.portfolio_manager is None:
-                raise RuntimeError("PortfolioManager not set for strategy.")
-            quantity_to_buy = int(self.portfolio_manager.cash / current_price)
+            quantity_to_buy = self.max_quantity(current_price)
             if quantity_to_buy > 0:
                 self.buy(quantity_to_buy, current_price)
                 self.in_position = True
-                print(f"{row.name}: BUY {quantity_to_buy} of {self.symbol} at {current_price}")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("%s: BUY %s of %s at %s", timestamp, quantity_to_buy, self.symbol, current_price)
         elif short_ma < long_ma and self.in_position:
             # Sell signal
             if self.portfolio_manager is None:
                 raise RuntimeError("PortfolioManager not set for strategy.")
-            quantity_to_sell = self.portfolio_manager.positions.get(self.symbol, {}).get("quantity", 0)
+            quantity_to_sell, _ = self.portfolio_manager.position_of(self.symbol)
             if quantity_to_sell > 0:
                 self.sell(quantity_to_sell, current_price)
                 self.in_position = False
-                print(f"{row.name}: SELL {quantity_to_sell} of {self.symbol} at {current_price}")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("%s: SELL %s of %s at %s", timestamp, quantity_to_sell, self.symbol, current_price)
 
 
@@ -1,14 +1,21 @@
 from src.strategies.base_strategy import Strategy
 import pandas as pd
 import numpy as np
-from collections import deque
 import logging
+from typing import Any, List, Optional, Sequence, Tuple
+from src.utils.rolling import rolling_zscore
+
+logger = logging.getLogger(__name__)
+
 
 class PairsTradingStrategy(Strategy):
     """
     A pairs trading strategy that trades on the mean-reversion of a spread
     between two correlated assets.
     """
+    __slots__ = ('symbol1', 'symbol2', 'window', 'entry_zscore', 'exit_zscore', 'in_position',
+                 'current_spread', 'close2', 'spread', 'zscores', 'zscore_values', 'signal_bars')
+
     def __init__(self, symbol1: str, symbol2: str, window: int = 60, entry_zscore: float = 2.0, exit_zscore: float = 0.5, stop_loss_percentage: float = 0.0):
         # For pairs trading, the 'symbol' in the base strategy is less relevant.
         # We'll use symbol1 as the primary symbol for portfolio management tracking.
@@ -19,70 +26,147 @@ class PairsTradingStrategy(Strategy):
         self.entry_zscore = entry_zscore
         self.exit_zscore = exit_zscore
         self.in_position = False
-        self.prices1_history = deque(maxlen=window)
-        self.prices2_history = deque(maxlen=window)
         self.current_spread = None
-        logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+        self.close2 = None
+        self.spread: Optional[np.ndarray] = None
+        self.zscores: Optional[np.ndarray] = None
+        self.zscore_values: Optional[list] = None
+        self.signal_bars: Optional[np.ndarray] = None
+
+    @classmethod
+    def batch_zscores(cls, data: pd.DataFrame, pairs: Sequence[Tuple[str, str]], windows: Sequence[int]) -> np.ndarray:
+        """
+        Precomputes the spread z-scores of several pairs over several windows at once.
+
+        The spreads of all pairs are taken in one vectorized subtraction, so a sweep over
+        pairs and windows does not rebuild them per strategy instance.
+
+        Args:
+            data: A DataFrame with a 'Close_SYMBOL' column for every symbol in the pairs.
+            pairs: The (symbol1, symbol2) pairs.
+            windows: The rolling window sizes.
+
+        Returns:
+            An array of shape (len(pairs), len(windows), len(data)). Entry [i, j] can be
+            passed to set_data of the strategy for pairs[i] with window windows[j].
+        """
+        first: List[str] = [f"Close_{symbol1}" for symbol1, _ in pairs]
+        second: List[str] = [f"Close_{symbol2}" for _, symbol2 in pairs]
+        spreads = (data[first].to_numpy(dtype=np.float64) - data[second].to_numpy(dtype=np.float64)).T
+        zscores = np.empty((len(pairs), len(windows), len(data)))
+        for i, spread in enumerate(spreads):
+            for j, window in enumerate(windows):
+                zscores[i, j] = rolling_zscore(spread, window)
+        return zscores
 
-    def set_data(self, data: pd.DataFrame):
+    def set_data(self, data: pd.DataFrame, zscores: Optional[np.ndarray] = None):
+        """
+        Sets the historical data and precomputes the spread z-scores over the full history.
+
+        Args:
+            data: A pandas DataFrame containing historical market data.
+            zscores: Optional precomputed z-scores of this pair's spread for this window,
+                such as a slice of batch_zscores, with one value per row of data. Computed
+                here if omitted.
+
+        Raises:
+            ValueError: If zscores does not have one value per row of data.
+        """
+        if zscores is not None:
+            zscores = np.asarray(zscores, dtype=np.float64)
+            if zscores.shape != (len(data),):
+                raise ValueError(f"Expected {len(data)} precomputed z-scores, got an array of shape {zscores.shape}.")
         # For pairs trading, data will contain both symbols. We need to adjust.
         # This strategy assumes 'data' is a multi-indexed DataFrame or has columns like 'symbol1_Close', 'symbol2_Close'
         # For simplicity, let's assume data has columns 'Close_SYMBOL1' and 'Close_SYMBOL2'
-        self.data = data
+        super().set_data(data)
+        # Resolve both legs' columns once here so on_bar_fast only indexes arrays
+        column2 = f"Close_{self.symbol2}"
+        if column2 not in data.columns or self.close is None:
+            self.close2 = self.spread = self.zscores = self.zscore_values = self.signal_bars = None
+            logger.error("Missing price data for %s or %s. Skipping.", self.symbol1, self.symbol2)
+            return
+        close2 = data[column2].to_numpy(dtype=np.float64)
+        self.close2 = close2.tolist()
+        # Calculate spread (simple difference for now, can be ratio or cointegrated residual)
+        self.spread = self.close - close2
+        # NaN during the warm-up and where the spread is flat over the window
+        self.zscores = rolling_zscore(self.spread, self.window) if zscores is None else zscores
+        # Python floats for on_bar_fast; indexing the array would box an np.float64 per bar
+        self.zscore_values = self.zscores.tolist()
+        # NaN z-scores compare False, so warm-up and zero-variance bars never become active.
+        abs_zscores = np.abs(self.zscores)
+        self.signal_bars = np.flatnonzero((abs_zscores > self.entry_zscore) | (abs_zscores < self.exit_zscore))
+
+    def active_bars(self) -> Optional[np.ndarray]:
+        """
+        Returns the bars on which the z-score is beyond the entry or within the exit threshold.
+
+        On every other bar neither an entry nor an exit can fire.
+
+        Returns:
+            A sorted integer array of bar indices, or None if the second leg has no data.
+        """
+        return self.signal_bars
+
+    def _close_leg(self, symbol: str, quantity: float, price: float):
+        """
+        Flattens an open position by trading its signed quantity back.
+
+        Args:
+            symbol: The symbol of the leg.
+            quantity: The signed position quantity (negative for a short).
+            price: The price at which to close.
+        """
+        (self.sell if quantity > 0 else self.buy)(abs(quantity), price, symbol=symbol)
 
     def on_bar(self, index: int, row: pd.Series):
+        if self.close2 is None:
+            return  # Missing price data, reported once by set_data
+        self.on_bar_fast(index, self.close[index], self.timestamps[index])
+
+    def on_bar_fast(self, index: int, close: float, timestamp: Any):
         self.current_index = index
 
         if self.data is None:
             raise RuntimeError("Data not set for strategy.")
 
-        # Assuming data has columns like 'Close_AAPL', 'Close_MSFT'
-        try:
-            price1 = row[f"Close_{self.symbol1}"]
-            price2 = row[f"Close_{self.symbol2}"]
-        except KeyError:
-            logging.error(f"Missing price data for {self.symbol1} or {self.symbol2} in row. Skipping.")
-            return
-
-        self.prices1_history.append(price1)
-        self.prices2_history.append(price2)
-
-        if len(self.prices1_history) < self.window:
+        if self.close2 is None:
+            return  # Missing price data, reported once by set_data
+        # Precomputed over the full history; NaN during the warm-up or if the spread is flat
+        zscore = self.zscore_values[index]
+        if zscore != zscore:
             return
 
-        # Calculate spread (simple difference for now, can be ratio or cointegrated residual)
-        spread_series = pd.Series(np.array(self.prices1_history) - np.array(self.prices2_history))
-        
-        mean_spread = spread_series.mean()
-        std_spread = spread_series.std()
-
-        if std_spread == 0:
-            return # Avoid division by zero
-
+        price1 = close
+        price2 = self.close2[index]
         self.current_spread = price1 - price2
-        zscore = (self.current_spread - mean_spread) / std_spread
 
         # Trading logic
         if not self.in_position:
+            if abs(zscore) <= self.entry_zscore:
+                return
+            # For simplicity, let's assume equal dollar amounts for now; both legs are
+            # sized before either trade changes the cash
+            quantity1 = self.max_quantity(price1, 0.5)
+            quantity2 = self.max_quantity(price2, 0.5)
+            if quantity1 <= 0 or quantity2 <= 0:
+                return # Not enough cash to open both legs
+
             if zscore > self.entry_zscore: # Spread is too wide, short symbol1, long symbol2
-                # Short symbol1, Long symbol2
-                # For simplicity, let's assume equal dollar amounts for now
-                quantity1 = int(self.portfolio_manager.cash * 0.5 / price1)
-                quantity2 = int(self.portfolio_manager.cash * 0.5 / price2)
-                if quantity1 > 0 and quantity2 > 0:
-                    self.sell(quantity1, price1) # Short symbol1
-                    self.buy(quantity2, price2) # Long symbol2
-                    self.in_position = True
-                    logging.info(f"{row.name}: ENTER PAIR (Short {self.symbol1}, Long {self.symbol2}) at Spread: {self.current_spread:.2f}, Z-score: {zscore:.2f}")
-            elif zscore < -self.entry_zscore: # Spread is too narrow, long symbol1, short symbol2
-                # Long symbol1, Short symbol2
-                quantity1 = int(self.portfolio_manager.cash * 0.5 / price1)
-                quantity2 = int(self.portfolio_manager.cash * 0.5 / price2)
-                if quantity1 > 0 and quantity2 > 0:
-                    self.buy(quantity1, price1) # Long symbol1
-                    self.sell(quantity2, price2) # Short symbol2
-                    self.in_position = True
-                    logging.info(f"{row.name}: ENTER PAIR (Long {self.symbol1}, Short {self.symbol2}) at Spread: {self.current_spread:.2f}, Z-score: {zscore:.2f}")
+                self.sell(quantity1, price1, symbol=self.symbol1) # Short symbol1
+                self.buy(quantity2, price2, symbol=self.symbol2) # Long symbol2
+                self.in_position = True
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info("%s: ENTER PAIR (Short %s, Long %s) at Spread: %.2f, Z-score: %.2f", timestamp,
+                                self.symbol1, self.symbol2, self.current_spread, zscore)
+            else: # Spread is too narrow, long symbol1, short symbol2
+                self.buy(quantity1, price1, symbol=self.symbol1) # Long symbol1
+                self.sell(quantity2, price2, symbol=self.symbol2) # Short symbol2
+                self.in_position = True
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info("%s: ENTER PAIR (Long %s, Short %s) at Spread: %.2f, Z-score: %.2f", timestamp,
+                                self.symbol1, self.symbol2, self.current_spread, zscore)
         else: # In a position, look for exit
             if abs(zscore) < self.exit_zscore:
                 # Close position
@@ -90,23 +174,17 @@ class PairsTradingStrategy(Strategy):
                 if self.portfolio_manager is None:
                     raise RuntimeError("PortfolioManager not set for strategy.")
 
-                # Get current quantities for both symbols
-                qty1 = self.portfolio_manager.positions.get(self.symbol1, {}).get("quantity", 0)
-                qty2 = self.portfolio_manager.positions.get(self.symbol2, {}).get("quantity", 0)
+                # Get current quantities for both symbols; position_of reads the arrays
+                # directly instead of building the positions dict
+                qty1, _ = self.portfolio_manager.position_of(self.symbol1)
+                qty2, _ = self.portfolio_manager.position_of(self.symbol2)
 
-                # Close position for symbol1 if open
+                # Close each leg if open: sell a long position, buy back a short one
                 if qty1 != 0:
-                    if qty1 > 0: # Long position
-                        self.sell(qty1, price1)
-                    else: # Short position
-                        self.buy(abs(qty1), price1)
-
-                # Close position for symbol2 if open
+                    self._close_leg(self.symbol1, qty1, price1)
                 if qty2 != 0:
-                    if qty2 > 0: # Long position
-                        self.sell(qty2, price2)
-                    else: # Short position
-                        self.buy(abs(qty2), price2)
+                    self._close_leg(self.symbol2, qty2, price2)
 
                 self.in_position = False
-                logging.info(f"{row.name}: EXIT PAIR at Spread: {self.current_spread:.2f}, Z-score: {zscore:.2f}")
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info("%s: EXIT PAIR at Spread: %.2f, Z-score: %.2f", timestamp, self.current_spread, zscore)
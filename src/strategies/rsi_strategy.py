@@ -1,7 +1,190 @@
 from src.strategies.base_strategy import Strategy
+import logging
+import math
 import pandas as pd
-from collections import deque
-from typing import Any
+import numpy as np
+from typing import Any, Optional, Tuple
+from src.utils.jit import njit, NUMBA_AVAILABLE
+
+try:
+    from scipy.signal import lfilter
+except ImportError:  # scipy is optional; without it the RSI recurrence runs as a plain loop
+    lfilter = None
+
+logger = logging.getLogger(__name__)
+
+
+@njit(cache=True)
+def _rsi_wilder(close: np.ndarray, period: int) -> np.ndarray:
+    """
+    Calculates Wilder's RSI over a full price series.
+
+    The average gain and loss are seeded with the simple mean of the first `period`
+    price changes and then updated with Wilder's smoothing,
+    avg = (avg * (period - 1) + x) / period. Leading NaN prices, such as those of a
+    symbol that starts later than the others it was joined with, are skipped.
+
+    Args:
+        close: Close prices.
+        period: The RSI period.
+
+    Returns:
+        An array of RSI values aligned with the input; the leading NaN prices and the
+        first `period` valid prices get NaN.
+    """
+    n = close.shape[0]
+    rsi = np.full(n, np.nan)
+    start = 0
+    while start < n and close[start] != close[start]:
+        start += 1
+    if n - start <= period:
+        return rsi
+
+    avg_gain = 0.0
+    avg_loss = 0.0
+    for i in range(start + 1, start + period + 1):
+        delta = close[i] - close[i - 1]
+        if delta > 0:
+            avg_gain += delta
+        else:
+            avg_loss -= delta
+    avg_gain /= period
+    avg_loss /= period
+
+    for i in range(start + period, n):
+        if i > start + period:
+            delta = close[i] - close[i - 1]
+            gain = delta if delta > 0 else 0.0
+            loss = -delta if delta < 0 else 0.0
+            avg_gain = (avg_gain * (period - 1) + gain) / period
+            avg_loss = (avg_loss * (period - 1) + loss) / period
+        if avg_loss == 0.0:
+            rsi[i] = 100.0
+        else:
+            rsi[i] = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+    return rsi
+
+
+def _rsi_wilder_lfilter(close: np.ndarray, period: int) -> np.ndarray:
+    """
+    Calculates Wilder's RSI with scipy's compiled IIR filter.
+
+    Wilder's smoothing is the single-pole filter y[i] = a * x[i] + (1 - a) * y[i - 1]
+    with a = 1 / period, so lfilter evaluates it without a Python-level loop. The
+    filter state is seeded so the first output equals the SMA seed of _rsi_wilder.
+    Leading NaN prices are skipped as in _rsi_wilder.
+
+    Args:
+        close: Close prices.
+        period: The RSI period.
+
+    Returns:
+        An array of RSI values aligned with the input; the leading NaN prices and the
+        first `period` valid prices get NaN.
+    """
+    n = close.shape[0]
+    rsi = np.full(n, np.nan)
+    valid = np.flatnonzero(close == close)
+    start = int(valid[0]) if valid.size else n
+    if n - start <= period:
+        return rsi
+
+    delta = np.diff(close[start:])
+    gain = np.where(delta > 0, delta, 0.0)
+    loss = np.where(delta < 0, -delta, 0.0)
+    alpha = 1.0 / period
+    averages = []
+    for values in (gain, loss):
+        seed = values[:period].mean()
+        smoothed, _ = lfilter([alpha], [1.0, alpha - 1.0], values[period:], zi=[(1.0 - alpha) * seed])
+        averages.append(np.concatenate(([seed], smoothed)))
+    avg_gain, avg_loss = averages
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi[start + period:] = np.where(avg_loss == 0.0, 100.0, 100.0 - 100.0 / (1.0 + avg_gain / avg_loss))
+    return rsi
+
+
+def rsi_wilder(close: np.ndarray, period: int) -> np.ndarray:
+    """
+    Calculates Wilder's RSI, choosing the fastest available implementation.
+
+    Uses the Numba kernel when Numba is installed, scipy's lfilter when only scipy is,
+    and the kernel as a plain Python loop otherwise.
+
+    Args:
+        close: Close prices.
+        period: The RSI period.
+
+    Returns:
+        An array of RSI values aligned with the input; the leading NaN prices and the
+        first `period` valid prices get NaN.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    if NUMBA_AVAILABLE or lfilter is None:
+        return _rsi_wilder(close, period)
+    return _rsi_wilder_lfilter(close, period)
+
+
+@njit(cache=True)
+def _rsi_signals_kernel(close: np.ndarray, period: int, overbought: float, oversold: float):
+    """
+    Calculates Wilder's RSI and thresholds it into trade signals in compiled code.
+
+    Args:
+        close: Close prices.
+        period: The RSI period.
+        overbought: Bars with an RSI above this are sell signals.
+        oversold: Bars with an RSI below this are buy signals.
+
+    Returns:
+        A tuple of (rsi, buy_signal, sell_signal, signal_bars).
+    """
+    rsi = _rsi_wilder(close, period)
+    n = rsi.shape[0]
+    buy_signal = np.zeros(n, dtype=np.bool_)
+    sell_signal = np.zeros(n, dtype=np.bool_)
+    signal_bars = np.empty(n, dtype=np.int64)
+    num_signals = 0
+    # NaN warm-up values compare False, so those bars never signal
+    for i in range(n):
+        value = rsi[i]
+        buy = value < oversold
+        sell = value > overbought
+        buy_signal[i] = buy
+        sell_signal[i] = sell
+        if buy or sell:
+            signal_bars[num_signals] = i
+            num_signals += 1
+    return rsi, buy_signal, sell_signal, signal_bars[:num_signals]
+
+
+def rsi_signals(close: np.ndarray, period: int, overbought: float,
+                oversold: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Calculates Wilder's RSI together with the RSI strategy's buy and sell signals.
+
+    With Numba the RSI and the thresholds are evaluated in a single compiled call;
+    otherwise the RSI comes from rsi_wilder and the signals from NumPy comparisons.
+
+    Args:
+        close: Close prices.
+        period: The RSI period.
+        overbought: Bars with an RSI above this are sell signals.
+        oversold: Bars with an RSI below this are buy signals.
+
+    Returns:
+        A tuple of (rsi, buy_signal, sell_signal, signal_bars), where signal_bars holds
+        the sorted indices of the bars on which either signal is set.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    if NUMBA_AVAILABLE:
+        return _rsi_signals_kernel(close, period, float(overbought), float(oversold))
+    rsi = rsi_wilder(close, period)
+    # NaN warm-up values compare False, so those bars never signal.
+    buy_signal = rsi < oversold
+    sell_signal = rsi > overbought
+    return rsi, buy_signal, sell_signal, np.flatnonzero(buy_signal | sell_signal)
+
 
 class RSIStrategy(Strategy):
     """
@@ -9,6 +192,10 @@ class RSIStrategy(Strategy):
     Buys when RSI crosses below a certain oversold threshold (e.g., 30).
     Sells when RSI crosses above a certain overbought threshold (e.g., 70).
     """
+    vectorized: bool = True
+    __slots__ = ('rsi_period', 'overbought_threshold', 'oversold_threshold', 'rsi', 'buy_signal',
+                 'sell_signal', 'signal_bars', 'in_position')
+
     def __init__(self, symbol: str, rsi_period: int = 14, overbought_threshold: float = 70.0, oversold_threshold: float = 30.0, stop_loss_percentage: float = 0.0):
         """
         Initializes the RSIStrategy.
@@ -24,69 +211,87 @@ class RSIStrategy(Strategy):
         self.rsi_period: int = rsi_period
         self.overbought_threshold: float = overbought_threshold
         self.oversold_threshold: float = oversold_threshold
-        self.close_prices: deque = deque(maxlen=rsi_period)
+        self.rsi: Optional[np.ndarray] = None
+        self.buy_signal: Optional[np.ndarray] = None
+        self.sell_signal: Optional[np.ndarray] = None
+        self.signal_bars: Optional[np.ndarray] = None
         self.in_position: bool = False
 
-    def calculate_rsi(self, prices: pd.Series, period: int) -> float:
+    def set_data(self, data: pd.DataFrame):
         """
-        Calculates the Relative Strength Index (RSI).
+        Sets the historical data and precomputes the RSI over the full history.
 
         Args:
-            prices: A pandas Series of close prices.
-            period: The period for RSI calculation.
+            data: A pandas DataFrame containing historical market data.
+        """
+        super().set_data(data)
+        self.rsi, self.buy_signal, self.sell_signal, self.signal_bars = rsi_signals(
+            self.close, self.rsi_period, self.overbought_threshold, self.oversold_threshold)
+
+    def active_bars(self) -> Optional[np.ndarray]:
+        """
+        Returns the bars on which the RSI is outside the thresholds.
+
+        On every other bar neither the buy nor the sell branch of on_bar_fast can fire.
 
         Returns:
-            The calculated RSI value.
+            A sorted integer array of bar indices.
         """
-        delta = prices.diff()
-        gain = delta.where(delta > 0, 0)
-        loss = -delta.where(delta < 0, 0)
+        return self.signal_bars
+
+    def calculate_rsi(self, prices: np.ndarray, period: int) -> float:
+        """
+        Calculates the Relative Strength Index (RSI) at the last of the given prices.
+
+        Uses Wilder's recursive smoothing rather than rebuilding pandas ewm objects,
+        so the result matches the values precomputed by set_data.
 
-        avg_gain = gain.ewm(com=period - 1, min_periods=period).mean()
-        avg_loss = loss.ewm(com=period - 1, min_periods=period).mean()
+        Args:
+            prices: Close prices, oldest first.
+            period: The period for RSI calculation.
 
-        rs = avg_gain / avg_loss
-        rsi = 100 - (100 / (1 + rs))
-        return rsi.iloc[-1] # Return the last RSI value
+        Returns:
+            The calculated RSI value, or NaN if there are not more than `period` prices.
+        """
+        # Runs over the price array in compiled code, without a Series or a list of floats
+        rsi = rsi_wilder(prices, period)
+        return float(rsi[-1]) if rsi.size else math.nan
 
-    def on_bar(self, index: int, row: pd.Series):
+    def on_bar_fast(self, index: int, close: float, timestamp: Any):
         """
-        Executes the RSI trading logic for each bar.
+        Executes the RSI trading logic for each bar using scalar inputs.
 
         Args:
             index: The current index of the data.
-            row: The current row of market data.
+            close: The current close price of the symbol.
+            timestamp: The timestamp of the current bar.
         """
         self.current_index = index
-        current_price = row[f"Close_{self.symbol}"]
-        self.close_prices.append(current_price)
+        current_price = close
 
         if self.data is None:
             raise RuntimeError("Data not set for strategy.")
 
-        if len(self.close_prices) < self.rsi_period:
-            return
-
-        prices_series = pd.Series(list(self.close_prices))
-        rsi = self.calculate_rsi(prices_series, self.rsi_period)
+        # NaN during the warm-up period, so neither signal fires
+        rsi = self.rsi[index]
 
         if rsi < self.oversold_threshold and not self.in_position:
             # Buy signal
-            if self.portfolio_manager is None:
-                raise RuntimeError("PortfolioManager not set for strategy.")
-            quantity_to_buy = int(self.portfolio_manager.cash / current_price)
+            quantity_to_buy = self.max_quantity(current_price)
             if quantity_to_buy > 0:
                 self.buy(quantity_to_buy, current_price)
                 self.in_position = True
-                print(f"{row.name}: BUY {quantity_to_buy} of {self.symbol} at {current_price}")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("%s: BUY %s of %s at %s", timestamp, quantity_to_buy, self.symbol, current_price)
         elif rsi > self.overbought_threshold and self.in_position:
             # Sell signal
             if self.portfolio_manager is None:
                 raise RuntimeError("PortfolioManager not set for strategy.")
-            quantity_to_sell = self.portfolio_manager.positions.get(self.symbol, {}).get("quantity", 0)
+            quantity_to_sell, _ = self.portfolio_manager.position_of(self.symbol)
             if quantity_to_sell > 0:
                 self.sell(quantity_to_sell, current_price)
                 self.in_position = False
-                print(f"{row.name}: SELL {quantity_to_sell} of {self.symbol} at {current_price}")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("%s: SELL %s of %s at %s", timestamp, quantity_to_sell, self.symbol, current_price)
 
 
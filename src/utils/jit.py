@@ -0,0 +1,26 @@
+from typing import Any, Callable
+
+try:
+    from numba import njit as _numba_njit, prange
+    NUMBA_AVAILABLE: bool = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+
+
+def njit(*args: Any, **kwargs: Any) -> Callable:
+    """
+    Compiles a function with numba.njit when Numba is installed.
+
+    Without Numba the decorated function is returned unchanged, so kernels keep
+    working as plain Python over NumPy arrays. Supports both the bare `@njit`
+    and the parameterised `@njit(cache=True)` forms.
+
+    Returns:
+        The compiled function, or the original function if Numba is unavailable.
+    """
+    if NUMBA_AVAILABLE:
+        return _numba_njit(*args, **kwargs)
+    if len(args) == 1 and callable(args[0]) and not kwargs:
+        return args[0]
+    return lambda func: func
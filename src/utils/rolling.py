@@ -0,0 +1,130 @@
+import math
+import numpy as np
+import pandas as pd
+from src.utils.jit import njit, NUMBA_AVAILABLE
+
+try:
+    import bottleneck as bn
+except ImportError:  # bottleneck is optional; pandas rolling windows are used without it
+    bn = None
+
+
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Calculates the trailing rolling mean of a 1D array.
+
+    Uses bottleneck's move_mean when it is installed and pandas rolling windows
+    otherwise. Like pandas, the first window - 1 values are NaN.
+
+    Args:
+        values: The input values.
+        window: The window size.
+
+    Returns:
+        A float64 array aligned with the input values.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if bn is not None:
+        return bn.move_mean(values, window=window, min_count=window)
+    return pd.Series(values).rolling(window=window).mean().to_numpy()
+
+
+def rolling_std(values: np.ndarray, window: int, ddof: int = 1) -> np.ndarray:
+    """
+    Calculates the trailing rolling standard deviation of a 1D array.
+
+    Uses bottleneck's move_std when it is installed and pandas rolling windows
+    otherwise. The default ddof of 1 matches pandas' rolling std.
+
+    Args:
+        values: The input values.
+        window: The window size.
+        ddof: The delta degrees of freedom.
+
+    Returns:
+        A float64 array aligned with the input values.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if bn is not None:
+        return bn.move_std(values, window=window, min_count=window, ddof=ddof)
+    return pd.Series(values).rolling(window=window).std(ddof=ddof).to_numpy()
+
+
+@njit(cache=True)
+def _rolling_zscore_kernel(values: np.ndarray, window: int, ddof: int) -> np.ndarray:
+    """
+    Calculates the trailing rolling z-score in a single pass.
+
+    Keeps the window's mean and sum of squared deviations with Welford's method,
+    extended to values leaving the window, so each step is O(1), stays accurate for
+    large values with small variance, and builds no intermediate mean or std arrays.
+    NaN values are skipped and tracked with a count of the valid values in the window;
+    like rolling_std with its min_count of `window`, a z-score is only produced once
+    the whole window is valid.
+
+    Args:
+        values: The input values.
+        window: The window size.
+        ddof: The delta degrees of freedom of the standard deviation.
+
+    Returns:
+        The z-scores; NaN while the window holds a NaN (including the warm-up) and
+        where the standard deviation is zero.
+    """
+    n = values.shape[0]
+    zscores = np.full(n, np.nan)
+    if window <= ddof:
+        return zscores
+    count = 0  # Valid values in the window
+    mean = 0.0
+    m2 = 0.0
+    for i in range(n):
+        value = values[i]
+        old = values[i - window] if i >= window else np.nan
+        if value == value and old == old:
+            # One valid value replaces another, so the count is unchanged
+            old_mean = mean
+            mean += (value - old) / count
+            m2 += (value - old) * (value - mean + old - old_mean)
+        else:
+            if old == old:
+                count -= 1
+                if count == 0:
+                    mean = 0.0
+                    m2 = 0.0
+                else:
+                    old_mean = mean
+                    mean -= (old - mean) / count
+                    m2 -= (old - old_mean) * (old - mean)
+            if value == value:
+                count += 1
+                delta = value - mean
+                mean += delta / count
+                m2 += delta * (value - mean)
+        if count == window and m2 > 0.0:
+            zscores[i] = (value - mean) / math.sqrt(m2 / (window - ddof))
+    return zscores
+
+
+def rolling_zscore(values: np.ndarray, window: int, ddof: int = 1) -> np.ndarray:
+    """
+    Calculates the z-score of each value against its trailing rolling window.
+
+    With Numba this is a single compiled pass; otherwise it is derived from
+    rolling_mean and rolling_std.
+
+    Args:
+        values: The input values.
+        window: The window size.
+        ddof: The delta degrees of freedom of the standard deviation.
+
+    Returns:
+        A float64 array aligned with the input values; NaN during the warm-up and
+        where the window's standard deviation is zero.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if NUMBA_AVAILABLE:
+        return _rolling_zscore_kernel(values, window, ddof)
+    std = rolling_std(values, window, ddof=ddof)
+    std[std == 0] = np.nan  # Avoid division by zero
+    return (values - rolling_mean(values, window)) / std
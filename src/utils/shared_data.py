@@ -0,0 +1,51 @@
+from multiprocessing import shared_memory
+from typing import Any, Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+def share_dataframe(df: pd.DataFrame) -> Tuple[shared_memory.SharedMemory, Dict[str, Any]]:
+    """
+    Copies the values of a numeric DataFrame into a shared memory block.
+
+    The caller owns the returned block and must close and unlink it once every
+    process attached to it is done.
+
+    Args:
+        df: The DataFrame to share. All columns are stored as float64.
+
+    Returns:
+        A tuple of the shared memory block and a picklable spec for attach_dataframe.
+    """
+    values = df.to_numpy(dtype=np.float64)
+    shm = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+    shared = np.ndarray(values.shape, dtype=values.dtype, buffer=shm.buf)
+    shared[:] = values
+    spec = {
+        'name': shm.name,
+        'shape': values.shape,
+        'index': df.index,
+        'columns': df.columns,
+    }
+    return shm, spec
+
+
+def attach_dataframe(spec: Dict[str, Any]) -> Tuple[shared_memory.SharedMemory, pd.DataFrame]:
+    """
+    Rebuilds a read-only DataFrame on top of a block created by share_dataframe.
+
+    The DataFrame is a view of the shared block, so the returned SharedMemory must
+    stay referenced for as long as the DataFrame is used.
+
+    Args:
+        spec: The spec returned by share_dataframe.
+
+    Returns:
+        A tuple of the attached shared memory block and the DataFrame.
+    """
+    shm = shared_memory.SharedMemory(name=spec['name'])
+    values = np.ndarray(spec['shape'], dtype=np.float64, buffer=shm.buf)
+    values.flags.writeable = False
+    df = pd.DataFrame(values, index=spec['index'], columns=spec['columns'], copy=False)
+    return shm, df
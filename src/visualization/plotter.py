@@ -5,12 +5,10 @@ import os
 import io
 
 
-def plot_equity_curve(equity_curve_json: str, title: str, output_path: str):
-    equity_curve_data = json.loads(equity_curve_json)
+def plot_equity_curve(equity_curve_data: dict, title: str, output_path: str):
     equity_curve_df = pd.DataFrame(
-        data=equity_curve_data["data"],
-        index=pd.to_datetime(equity_curve_data["index"], unit="ms"),
-        columns=equity_curve_data["columns"]
+        {"equity": equity_curve_data["equity"]},
+        index=pd.to_datetime(equity_curve_data["index"], unit="ms")
     )
 
     plt.figure(figsize=(12, 6))
@@ -34,10 +32,10 @@ if __name__ == "__main__":
 
     for ticker, strategies_results in all_results.items():
         for strategy_name, results in strategies_results.items():
-            equity_curve_json = results["equity_curve"]
+            equity_curve_data = results["equity_curve"]
             plot_title = f"{ticker} - {strategy_name} Equity Curve"
             output_filename = f"{ticker}_{strategy_name}_equity_curve.png"
             output_path = os.path.join(reports_dir, output_filename)
-            plot_equity_curve(equity_curve_json, plot_title, output_path)
+            plot_equity_curve(equity_curve_data, plot_title, output_path)
 
 
@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+import pytest
+import src.backtesting.engine as engine_module
+from src.backtesting.engine import BacktestingEngine
+from src.strategies.moving_average_crossover import MovingAverageCrossover
+from src.strategies.rsi_strategy import RSIStrategy
+from src.strategies.mean_reversion import MeanReversion
+
+def _price_data(num_bars=1500, seed=7):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, num_bars)))
+    return pd.DataFrame({"Close_TEST": close}, index=pd.date_range("2015-01-01", periods=num_bars, freq="D"))
+
+def _run(monkeypatch, strategy, compiled):
+    # The engine takes the single-pass kernel only when it believes Numba is installed
+    monkeypatch.setattr(engine_module, "NUMBA_AVAILABLE", compiled)
+    engine = BacktestingEngine(initial_cash=100000, data_path="data")
+    engine.set_data(_price_data())
+    engine.set_strategy(strategy)
+    engine.run_backtest()
+    return engine.portfolio_manager
+
+@pytest.mark.parametrize("stop_loss_percentage", [0.0, 0.03])
+@pytest.mark.parametrize("make_strategy", [
+    lambda stop_loss: RSIStrategy("TEST", rsi_period=14, stop_loss_percentage=stop_loss),
+    lambda stop_loss: MovingAverageCrossover("TEST", short_window=10, long_window=30, stop_loss_percentage=stop_loss),
+    lambda stop_loss: MeanReversion("TEST", window=20, num_std_dev=2, stop_loss_percentage=stop_loss),
+], ids=["rsi", "ma_crossover", "mean_reversion"])
+def test_vectorized_backtest_matches_bar_loop(monkeypatch, make_strategy, stop_loss_percentage):
+    loop = _run(monkeypatch, make_strategy(stop_loss_percentage), compiled=False)
+    kernel = _run(monkeypatch, make_strategy(stop_loss_percentage), compiled=True)
+
+    assert loop.trades
+    assert kernel.trades == loop.trades
+    assert kernel.closed_trades == loop.closed_trades
+    np.testing.assert_allclose(kernel.equity_ndarray()[1], loop.equity_ndarray()[1], rtol=1e-12)
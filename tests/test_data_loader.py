@@ -0,0 +1,48 @@
+import os
+import pytest
+from src.data.data_loader import DataLoader
+
+def _write_csv(path, closes, mtime=None):
+    lines = ["Price,Close,High,Low,Open,Volume", "Ticker,TEST,TEST,TEST,TEST,TEST", "Date,,,,,"]
+    for day, close in enumerate(closes, start=1):
+        lines.append(f"2020-01-{day:02d},{close},{close + 1},{close - 1},{close},1000")
+    path.write_text("\n".join(lines) + "\n")
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+
+def test_load_csv_writes_nothing_by_default(tmp_path):
+    _write_csv(tmp_path / "TEST.csv", [10.0, 11.0, 12.0])
+    df = DataLoader(str(tmp_path)).load_csv("TEST.csv")
+    assert list(df.columns) == ["Open", "High", "Low", "Close", "Volume"]
+    assert os.listdir(tmp_path) == ["TEST.csv"]
+
+def test_parquet_cache_is_refreshed_when_csv_changes(tmp_path):
+    pytest.importorskip("pyarrow")
+    csv_path = tmp_path / "data" / "TEST.csv"
+    csv_path.parent.mkdir()
+    cache_dir = tmp_path / "cache"
+    _write_csv(csv_path, [10.0, 11.0, 12.0], mtime=1_000_000)
+
+    first = DataLoader(str(csv_path.parent), cache_dir=str(cache_dir)).load_csv("TEST.csv")
+    assert (cache_dir / "TEST.parquet").exists()
+    assert os.listdir(csv_path.parent) == ["TEST.csv"]
+    assert first["Close"].tolist() == [10.0, 11.0, 12.0]
+
+    # A CSV modified after the cache was written must be parsed again
+    _write_csv(csv_path, [20.0, 21.0, 22.0, 23.0], mtime=os.path.getmtime(cache_dir / "TEST.parquet") + 10)
+    second = DataLoader(str(csv_path.parent), cache_dir=str(cache_dir)).load_csv("TEST.csv")
+    assert second["Close"].tolist() == [20.0, 21.0, 22.0, 23.0]
+    cached = DataLoader(str(csv_path.parent), cache_dir=str(cache_dir)).load_csv("TEST.csv")
+    assert cached["Close"].tolist() == [20.0, 21.0, 22.0, 23.0]
+
+@pytest.mark.parametrize("use_cache", [False, True])
+def test_load_csv_columns_subset(tmp_path, use_cache):
+    if use_cache:
+        pytest.importorskip("pyarrow")
+    _write_csv(tmp_path / "TEST.csv", [10.0, 11.0, 12.0])
+    cache_dir = str(tmp_path / "cache") if use_cache else None
+    # Read twice so the second load comes from the cache when one is configured
+    for _ in range(2):
+        df = DataLoader(str(tmp_path), cache_dir=cache_dir, columns=["Volume", "Close"]).load_csv("TEST.csv")
+        assert list(df.columns) == ["Close", "Volume"]
+        assert df["Close"].tolist() == [10.0, 11.0, 12.0]
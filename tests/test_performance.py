@@ -1,5 +1,8 @@
+import math
+import numpy as np
 import pytest
-from src.reporting.performance import PerformanceCalculator
+import src.reporting.performance as performance
+from src.reporting.performance import PerformanceCalculator, return_moments
 
 def test_cagr():
     equity_curve = [
@@ -22,7 +25,6 @@ def test_sharpe_ratio():
     trades = []
     calculator = PerformanceCalculator(equity_curve, trades)
     calculated_sharpe = calculator.sharpe_ratio()
-    print(f"Calculated Sharpe Ratio: {calculated_sharpe}") # Debug print
     assert calculated_sharpe == pytest.approx(13.13955286444126, abs=1e-2) # Updated expected value
 
 def test_sortino_ratio():
@@ -36,8 +38,7 @@ def test_sortino_ratio():
     trades = []
     calculator = PerformanceCalculator(equity_curve, trades)
     calculated_sortino = calculator.sortino_ratio()
-    print(f"Calculated Sortino Ratio: {calculated_sortino}") # Debug print
-    assert calculated_sortino == pytest.approx(14.8675, abs=1e-4) # Updated expected value based on new data
+    assert calculated_sortino == pytest.approx(9.1757, abs=1e-4) # Downside deviation over all periods against a zero target
 
 def test_max_drawdown():
     equity_curve = [
@@ -66,3 +67,30 @@ def test_win_loss_ratio():
     ]
     calculator = PerformanceCalculator(equity_curve, trades)
     assert calculator.win_loss_ratio() == 2.0
+
+def _numpy_moments(returns):
+    # The NumPy reductions the metrics used before the single-pass kernel
+    return returns.mean(), returns.std(ddof=1), np.sqrt(np.mean(np.minimum(returns, 0.0) ** 2))
+
+@pytest.mark.parametrize("use_numba", [True, False])
+@pytest.mark.parametrize("returns", [
+    np.random.default_rng(0).normal(0.0005, 0.01, 1000),
+    np.array([0.01, -0.02, 0.03, -0.01, 0.0]),
+    np.array([0.01, 0.02, 0.03]),  # No negative returns: zero downside deviation
+], ids=["random", "mixed", "positive"])
+def test_return_moments_match_numpy(monkeypatch, use_numba, returns):
+    monkeypatch.setattr(performance, "NUMBA_AVAILABLE", use_numba and performance.NUMBA_AVAILABLE)
+    np.testing.assert_allclose(return_moments(returns), _numpy_moments(returns), rtol=1e-12, atol=1e-15)
+
+def test_return_moments_kernel_matches_python_loop():
+    kernel = performance._return_moments_kernel
+    python_kernel = getattr(kernel, "py_func", kernel)
+    returns = np.random.default_rng(1).normal(0.0, 0.02, 500)
+    np.testing.assert_allclose(kernel(returns), python_kernel(returns), rtol=1e-12)
+
+@pytest.mark.parametrize("use_numba", [True, False])
+def test_return_moments_short_inputs(monkeypatch, use_numba):
+    monkeypatch.setattr(performance, "NUMBA_AVAILABLE", use_numba and performance.NUMBA_AVAILABLE)
+    assert all(math.isnan(value) for value in return_moments(np.array([])))
+    mean, std, downside_deviation = return_moments(np.array([-0.02]))
+    assert mean == pytest.approx(-0.02) and math.isnan(std) and downside_deviation == pytest.approx(0.02)
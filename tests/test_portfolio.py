@@ -0,0 +1,78 @@
+import math
+import numpy as np
+import pytest
+import src.portfolio.manager as manager
+from src.portfolio.manager import PortfolioManager, apply_trade
+
+# The compiled kernel and the plain Python function it was compiled from (the same
+# object when Numba is not installed); both must book trades identically.
+APPLY_TRADE_IMPLEMENTATIONS = [apply_trade, getattr(apply_trade, "py_func", apply_trade)]
+
+# Each step is (is_buy, quantity, price) followed by the expected
+# (cash, quantity, avg_price, realized_pnl) after it; every trade pays a commission of 1.
+LONG_ROUND_TRIP = [
+    ((True, 10, 100.0), (8999.0, 10.0, 100.0, math.nan)),    # Open: 10000 - 1000 - 1
+    ((True, 10, 110.0), (7898.0, 20.0, 105.0, math.nan)),    # Add: average of 100 and 110
+    ((False, 5, 120.0), (8497.0, 15.0, 105.0, 74.0)),        # Reduce: (120 - 105) * 5 - 1
+    ((False, 15, 90.0), (9846.0, 0.0, 0.0, -226.0)),         # Close: (90 - 105) * 15 - 1
+]
+SHORT_ROUND_TRIP = [
+    ((False, 10, 100.0), (10999.0, -10.0, 100.0, math.nan)), # Open: 10000 + 1000 - 1
+    ((False, 10, 90.0), (11898.0, -20.0, 95.0, math.nan)),   # Add: average of 100 and 90
+    ((True, 5, 80.0), (11497.0, -15.0, 95.0, 74.0)),         # Reduce: (95 - 80) * 5 - 1
+    ((True, 15, 100.0), (9996.0, 0.0, 0.0, -76.0)),          # Close: (95 - 100) * 15 - 1
+]
+FLIPS = [
+    ((True, 10, 100.0), (8999.0, 10.0, 100.0, math.nan)),
+    ((False, 25, 110.0), (11748.0, -15.0, 110.0, 99.0)),     # Long to short: (110 - 100) * 10 - 1
+    ((True, 20, 100.0), (9747.0, 5.0, 100.0, 149.0)),        # Short to long: (110 - 100) * 15 - 1
+]
+
+def _assert_matches(result, expected):
+    executed, cash, quantity, avg_price, pnl = result
+    expected_cash, expected_quantity, expected_avg_price, expected_pnl = expected
+    assert executed
+    assert cash == pytest.approx(expected_cash)
+    assert quantity == pytest.approx(expected_quantity)
+    assert avg_price == pytest.approx(expected_avg_price)
+    if math.isnan(expected_pnl):
+        assert math.isnan(pnl)
+    else:
+        assert pnl == pytest.approx(expected_pnl)
+
+@pytest.mark.parametrize("apply", APPLY_TRADE_IMPLEMENTATIONS, ids=["compiled", "python"])
+@pytest.mark.parametrize("steps", [LONG_ROUND_TRIP, SHORT_ROUND_TRIP, FLIPS], ids=["long", "short", "flips"])
+def test_apply_trade_accounting(apply, steps):
+    cash, quantity, avg_price = 10000.0, 0.0, 0.0
+    for (is_buy, trade_quantity, price), expected in steps:
+        result = apply(is_buy, float(trade_quantity), price, 1.0, cash, quantity, avg_price)
+        _assert_matches(result, expected)
+        _, cash, quantity, avg_price, _ = result
+
+@pytest.mark.parametrize("apply", APPLY_TRADE_IMPLEMENTATIONS, ids=["compiled", "python"])
+def test_apply_trade_rejects_unaffordable_buy(apply):
+    executed, cash, quantity, avg_price, pnl = apply(True, 10.0, 100.0, 1.0, 1000.0, 0.0, 0.0)
+    assert not executed
+    assert (cash, quantity, avg_price) == (1000.0, 0.0, 0.0)
+    assert math.isnan(pnl)
+
+def _run_trades(monkeypatch, apply):
+    monkeypatch.setattr(manager, "apply_trade", apply)
+    portfolio = PortfolioManager(10000.0)
+    steps = [("AAA", step) for step, _ in LONG_ROUND_TRIP + FLIPS] + [("BBB", step) for step, _ in SHORT_ROUND_TRIP]
+    for day, (symbol, (is_buy, quantity, price)) in enumerate(steps):
+        portfolio.execute_trade({'symbol': symbol, 'type': 'buy' if is_buy else 'sell', 'quantity': quantity,
+                                 'price': price, 'commission': 1.0, 'timestamp': np.datetime64('2020-01-01') + day})
+    return portfolio
+
+def test_execute_trade_matches_across_implementations(monkeypatch):
+    compiled = _run_trades(monkeypatch, APPLY_TRADE_IMPLEMENTATIONS[0])
+    python = _run_trades(monkeypatch, APPLY_TRADE_IMPLEMENTATIONS[1])
+    # 10000 - 154 (long round trip) - 253 (flips) - 4 (short round trip)
+    assert compiled.cash == pytest.approx(10000 - 154 - 253 - 4)
+    assert python.cash == compiled.cash
+    assert python.position_of("AAA") == compiled.position_of("AAA") == pytest.approx((5.0, 100.0))
+    assert python.position_of("BBB") == compiled.position_of("BBB") == (0.0, 0.0)
+    assert python.trades == compiled.trades
+    assert python.closed_trades == compiled.closed_trades
+    assert [trade['pnl'] for trade in compiled.closed_trades] == pytest.approx([74.0, -226.0, 99.0, 149.0, 74.0, -76.0])
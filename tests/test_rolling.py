@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+import src.utils.rolling as rolling
+from src.utils.rolling import rolling_mean, rolling_std, rolling_zscore
+
+def _fallback_zscore(values, window):
+    std = rolling_std(values, window)
+    std[std == 0] = np.nan
+    return (values - rolling_mean(values, window)) / std
+
+def _spread_with_gaps():
+    values = 100 + np.cumsum(np.random.default_rng(0).normal(size=400))
+    values[:5] = np.nan  # One leg of an outer-joined pair starts later
+    values[200] = np.nan
+    return values
+
+@pytest.mark.parametrize("use_numba", [True, False])
+def test_rolling_zscore_skips_nans(monkeypatch, use_numba):
+    monkeypatch.setattr(rolling, "NUMBA_AVAILABLE", use_numba and rolling.NUMBA_AVAILABLE)
+    values = _spread_with_gaps()
+    expected = _fallback_zscore(values, 20)
+    zscores = rolling_zscore(values, 20)
+    np.testing.assert_allclose(zscores, expected, rtol=1e-9, atol=1e-9)
+    # Valid again once the window has moved past each NaN
+    assert np.isnan(zscores[:24]).all() and np.isfinite(zscores[24:200]).all()
+    assert np.isnan(zscores[200:220]).all() and np.isfinite(zscores[220:]).all()
+
+def test_rolling_zscore_kernel_matches_python_loop():
+    kernel = rolling._rolling_zscore_kernel
+    python_kernel = getattr(kernel, "py_func", kernel)
+    values = _spread_with_gaps()
+    np.testing.assert_allclose(kernel(values, 20, 1), python_kernel(values, 20, 1), rtol=1e-12, atol=1e-12)
+
+def test_rolling_zscore_flat_window_is_nan():
+    values = np.concatenate([np.full(30, 5.0), np.arange(30.0)])
+    zscores = rolling_zscore(values, 10)
+    assert np.isnan(zscores[:30]).all()
+    assert np.isfinite(zscores[31:]).all()
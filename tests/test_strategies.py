@@ -0,0 +1,158 @@
+import math
+import statistics
+import numpy as np
+import pandas as pd
+import pytest
+import src.strategies.rsi_strategy as rsi_strategy
+import src.utils.rolling as rolling
+from src.utils.rolling import rolling_zscore
+from src.portfolio.manager import PortfolioManager
+from src.strategies._signal_kernel import simulate_signals
+from src.strategies.mean_reversion import MeanReversion
+from src.strategies.pairs_trading_strategy import PairsTradingStrategy
+from src.strategies.rsi_strategy import _rsi_wilder, _rsi_wilder_lfilter, rsi_signals, rsi_wilder
+
+def _reference_rsi(close, period):
+    # Textbook Wilder RSI: SMA seed over the first `period` changes, then Wilder's smoothing
+    rsi = [math.nan] * len(close)
+    start = next((i for i, price in enumerate(close) if not math.isnan(price)), len(close))
+    changes = [close[i] - close[i - 1] for i in range(start + 1, len(close))]
+    if len(changes) < period:
+        return np.array(rsi)
+    avg_gain = sum(max(change, 0.0) for change in changes[:period]) / period
+    avg_loss = sum(max(-change, 0.0) for change in changes[:period]) / period
+    for offset, change in enumerate(changes[period - 1:]):
+        if offset > 0:
+            avg_gain = (avg_gain * (period - 1) + max(change, 0.0)) / period
+            avg_loss = (avg_loss * (period - 1) + max(-change, 0.0)) / period
+        rsi[start + period + offset] = 100.0 if avg_loss == 0 else 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+    return np.array(rsi)
+
+def _prices(leading_nans=0):
+    close = 100 * np.exp(np.cumsum(np.random.default_rng(1).normal(0, 0.02, 300)))
+    close[:leading_nans] = np.nan  # A symbol that starts later than the others it was joined with
+    return close
+
+@pytest.mark.parametrize("leading_nans", [0, 7])
+@pytest.mark.parametrize("implementation", [
+    _rsi_wilder, getattr(_rsi_wilder, "py_func", _rsi_wilder), _rsi_wilder_lfilter,
+], ids=["compiled", "python", "lfilter"])
+def test_rsi_wilder_matches_reference(implementation, leading_nans):
+    if implementation is _rsi_wilder_lfilter and rsi_strategy.lfilter is None:
+        pytest.skip("scipy is not installed")
+    close = _prices(leading_nans)
+    expected = _reference_rsi(close.tolist(), 14)
+    assert np.isfinite(expected[leading_nans + 14:]).all()
+    np.testing.assert_allclose(implementation(close, 14), expected, rtol=1e-9)
+
+def test_rsi_wilder_short_series_is_nan():
+    assert np.isnan(rsi_wilder(_prices()[:14], 14)).all()
+    assert np.isnan(rsi_wilder(np.full(20, np.nan), 14)).all()
+
+@pytest.mark.parametrize("use_numba", [True, False])
+def test_rsi_signals_match_thresholds(monkeypatch, use_numba):
+    monkeypatch.setattr(rsi_strategy, "NUMBA_AVAILABLE", use_numba and rsi_strategy.NUMBA_AVAILABLE)
+    close = _prices(leading_nans=7)
+    rsi, buy_signal, sell_signal, signal_bars = rsi_signals(close, 14, 70, 30)
+    expected = _reference_rsi(close.tolist(), 14)
+    np.testing.assert_allclose(rsi, expected, rtol=1e-9)
+    np.testing.assert_array_equal(buy_signal, expected < 30)
+    np.testing.assert_array_equal(sell_signal, expected > 70)
+    np.testing.assert_array_equal(signal_bars, np.flatnonzero((expected < 30) | (expected > 70)))
+
+def _pair_data(num_bars=400):
+    rng = np.random.default_rng(3)
+    close2 = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, num_bars)))
+    close1 = close2 + rng.normal(0, 2.0, num_bars)
+    return pd.DataFrame({"Close_AAA": close1, "Close_BBB": close2},
+                        index=pd.date_range("2020-01-01", periods=num_bars, freq="D"))
+
+def test_pairs_batch_zscores_match_rolling_zscore():
+    data = _pair_data()
+    data["Close_CCC"] = data["Close_BBB"] * 1.1
+    pairs, windows = [("AAA", "BBB"), ("CCC", "AAA")], [20, 30]
+    zscores = PairsTradingStrategy.batch_zscores(data, pairs, windows)
+    assert zscores.shape == (len(pairs), len(windows), len(data))
+    for i, (symbol1, symbol2) in enumerate(pairs):
+        spread = data[f"Close_{symbol1}"].to_numpy() - data[f"Close_{symbol2}"].to_numpy()
+        for j, window in enumerate(windows):
+            np.testing.assert_array_equal(zscores[i, j], rolling_zscore(spread, window))
+
+    # A strategy given its slice trades on the same bars as one computing its own z-scores
+    batched = PairsTradingStrategy("CCC", "AAA", window=30)
+    batched.set_data(data, zscores=zscores[1, 1])
+    computed = PairsTradingStrategy("CCC", "AAA", window=30)
+    computed.set_data(data)
+    np.testing.assert_array_equal(batched.signal_bars, computed.signal_bars)
+
+def test_pairs_rejects_misaligned_zscores():
+    data = _pair_data()
+    strategy = PairsTradingStrategy("AAA", "BBB", window=20)
+    with pytest.raises(ValueError):
+        strategy.set_data(data, zscores=np.zeros(len(data) - 1))
+    with pytest.raises(ValueError):
+        strategy.set_data(data, zscores=PairsTradingStrategy.batch_zscores(data, [("AAA", "BBB")], [20])[0])
+
+def test_pairs_legs_are_booked_per_symbol_and_flat_after_exit():
+    data = _pair_data()
+    strategy = PairsTradingStrategy("AAA", "BBB", window=20, entry_zscore=2.0, exit_zscore=0.5)
+    strategy.set_data(data)
+    portfolio = PortfolioManager(100000.0)
+    strategy.initialize(portfolio)
+    exits = 0
+    for index, (close, timestamp) in enumerate(zip(strategy.close, data.index)):
+        was_in_position = strategy.in_position
+        strategy.on_bar_fast(index, close, timestamp)
+        qty1, _ = portfolio.position_of("AAA")
+        qty2, _ = portfolio.position_of("BBB")
+        if strategy.in_position:
+            # The legs are opposite positions in their own symbols
+            assert qty1 * qty2 < 0
+        else:
+            assert qty1 == 0 and qty2 == 0
+            exits += was_in_position
+    assert exits > 0
+    assert {trade['symbol'] for trade in portfolio.trades} == {"AAA", "BBB"}
+
+def _reference_bands(close, window, num_std_dev):
+    # Plain Python Bollinger bands over each trailing window of `window` prices
+    upper = [math.nan] * len(close)
+    lower = [math.nan] * len(close)
+    for i in range(window - 1, len(close)):
+        prices = close[i - window + 1:i + 1]
+        mean, std = statistics.fmean(prices), statistics.stdev(prices)
+        upper[i], lower[i] = mean + num_std_dev * std, mean - num_std_dev * std
+    return np.array(upper), np.array(lower)
+
+@pytest.mark.parametrize("use_bottleneck", [True, False])
+def test_mean_reversion_bands_and_signals_match_reference(monkeypatch, use_bottleneck):
+    if use_bottleneck and rolling.bn is None:
+        pytest.skip("bottleneck is not installed")
+    if not use_bottleneck:
+        monkeypatch.setattr(rolling, "bn", None)
+    close = _prices()
+    strategy = MeanReversion("TEST", window=20, num_std_dev=2)
+    strategy.set_data(pd.DataFrame({"Close_TEST": close}, index=pd.date_range("2020-01-01", periods=close.size, freq="D")))
+    upper, lower = _reference_bands(close.tolist(), 20, 2)
+    np.testing.assert_allclose(strategy.upper_band, upper, rtol=1e-9)
+    np.testing.assert_allclose(strategy.lower_band, lower, rtol=1e-9)
+    np.testing.assert_array_equal(strategy.buy_signal, close < lower)
+    np.testing.assert_array_equal(strategy.sell_signal, close > upper)
+    np.testing.assert_array_equal(strategy.active_bars(), np.flatnonzero((close < lower) | (close > upper)))
+    assert strategy.active_bars().size > 0
+
+@pytest.mark.parametrize("stop_loss_percentage", [0.0, 0.03])
+def test_simulate_signals_kernel_matches_python_loop(stop_loss_percentage):
+    close = _prices()
+    strategy = MeanReversion("TEST", window=20, num_std_dev=2, stop_loss_percentage=stop_loss_percentage)
+    strategy.set_data(pd.DataFrame({"Close_TEST": close}, index=pd.date_range("2020-01-01", periods=close.size, freq="D")))
+    args = (close, strategy.buy_signal, strategy.sell_signal, 100000.0, stop_loss_percentage)
+    compiled = simulate_signals(*args)
+    python = getattr(simulate_signals, "py_func", simulate_signals)(*args)
+    num_trades = compiled[6]
+    assert num_trades == python[6] > 0
+    np.testing.assert_allclose(compiled[0], python[0], rtol=1e-12)
+    # The trade buffers are only filled up to num_trades
+    for compiled_value, python_value in zip(compiled[1:6], python[1:6]):
+        np.testing.assert_allclose(compiled_value[:num_trades], python_value[:num_trades], rtol=1e-12)
+    np.testing.assert_allclose(compiled[7:], python[7:], rtol=1e-12)